@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous counterparts of building menus, for ASGI deployments. Requires python 3.5+ and asgiref (shipped with
+django 3.0+). Coroutine permission checks of sibling items are run concurrently, synchronous builders and checks are
+run in a thread, so they don't block event loop.
+"""
+from __future__ import unicode_literals
+
+import asyncio
+import inspect
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.template import RequestContext
+from six import get_unbound_function
+
+from admin_toolbox import instrumentation, menus, metrics, permission_checks
+from admin_toolbox.builders import ItemBuilder, ModelBuilder
+from admin_toolbox.nodes import MenuState, is_static_item, is_static_list
+from admin_toolbox.permissions import get_evaluator
+
+
+def is_async(func):
+    return asyncio.iscoroutinefunction(func) or asyncio.iscoroutinefunction(getattr(func, '__call__', None))
+
+
+def overrides(builder, method_name, base):
+    """
+    Checks if class of builder overrides method of specified base class.
+    """
+    return get_unbound_function(getattr(type(builder), method_name)) is not get_unbound_function(
+        getattr(base, method_name)
+    )
+
+
+async def wait(awaitable):
+    return await awaitable
+
+
+def run(awaitable):
+    """
+    Runs awaitable from synchronous code and returns it's result.
+    """
+    return async_to_sync(wait)(awaitable)
+
+
+async def call(func, *args):
+    """
+    Calls function that may be either coroutine function or synchronous one. Synchronous functions are run in a thread.
+    """
+    if is_async(func):
+        return await func(*args)
+    result = await sync_to_async(func)(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def check_permissions(builder, request=None, context=None, menu_name='default'):
+    if builder.permissions_check is None:
+        return True
+    if overrides(builder, 'check_permissions', ItemBuilder):
+        return await call(builder.check_permissions, request, context, menu_name)
+
+    scope = builder.permissions_check_scope
+    key = None
+    if scope is not None:
+        key = permission_checks.get_key(builder.permissions_check, scope, request, menu_name)
+    if key is not None:
+        result = permission_checks.lookup(key, scope, request)
+        if result is not permission_checks.MISSING:
+            return result
+
+    metrics.get_metrics().increment('permissions.checks', tags={'kind': 'item'})
+    with instrumentation.timed_check(builder.permissions_check):
+        result = await call(builder.permissions_check, request, context, menu_name)
+    if key is not None:
+        permission_checks.store(key, scope, result, builder.permissions_check_timeout, request)
+    return result
+
+
+async def has_module_permission(builder, request):
+    evaluator = getattr(request, '_admin_toolbox_permissions', None)
+    if (
+        builder.default_module_permission and evaluator is not None and
+        not isinstance(evaluator.module_perms, dict)
+    ):
+        # resolved already, no need to go to thread
+        metrics.get_metrics().increment('permissions.checks', tags={'kind': 'module'})
+        return evaluator.has_module_perms(builder.app_label)
+    return await call(builder.has_module_permission, request)
+
+
+async def is_visible(builder, request=None, context=None, menu_name='default'):
+    """
+    Coroutine counterpart of `is_visible` of builder.
+    """
+    if isinstance(builder, ModelBuilder) and not overrides(builder, 'is_visible', ModelBuilder):
+        if builder.url is None:
+            return False
+        if request and not await has_module_permission(builder, request):
+            return False
+        return await check_permissions(builder, request, context, menu_name)
+
+    if isinstance(builder, ItemBuilder) and not overrides(builder, 'is_visible', ItemBuilder):
+        return await check_permissions(builder, request, context, menu_name)
+
+    return await call(builder.is_visible, request, context, menu_name)
+
+
+async def build(builder, request=None, context=None, menu_name='default'):
+    """
+    Coroutine counterpart of `build` of builder. Items of lists are built concurrently.
+    """
+    if is_static_list(builder):
+        items = await asyncio.gather(*(
+            item.abuild(request, context, menu_name) if hasattr(item, 'abuild') else
+            call(item.build, request, context, menu_name)
+            for item in builder.items
+        ))
+        return {
+            'name': builder.name,
+            'icon': builder.icon,
+            'items': list(items),
+        }
+
+    if is_static_item(builder):
+        if await is_visible(builder, request, context, menu_name):
+            return {
+                'url': builder.url,
+                'name': builder.name,
+                'icon': builder.icon,
+            }
+        return None
+
+    return await call(builder.build, request, context, menu_name)
+
+
+async def build_state(menu, request=None, context=None, menu_name='default', opened=None):
+    """
+    Coroutine counterpart of `MenuState.build`. All dynamic nodes and items of menu, except of ones in deferred lazy
+    lists, are checked concurrently.
+    """
+    if request is not None and hasattr(request, 'user'):
+        # resolving user and it's permissions may need database
+        await sync_to_async(get_evaluator)(request)
+    if request is not None and menu.memoized_checks:
+        # version of memoized checks is kept in django cache
+        await sync_to_async(permission_checks.get_version)(request)
+
+    state = MenuState(menu)
+    hidden = state.defer(getattr(request, 'path', None), opened)
+    nodes = [
+        node for node in menu.nodes
+        if (node.dynamic or not node.is_list or (node.index in state.deferred and node.builder is not None)) and
+        (node.parent is None or node.parent.index not in hidden)
+    ]
+    results = await asyncio.gather(*(
+        node.builder.abuild(request, context, menu_name) if node.dynamic else
+        is_visible(node.builder, request, context, menu_name)
+        for node in nodes
+    ))
+
+    with instrumentation.timed('tree'):
+        state.compact(request, context, menu_name, dict(zip((node.index for node in nodes), results)), opened)
+    await sync_to_async(state.count_badges)()
+    return state
+
+
+async def get_sidebar_content(request, context=None, menu_name=None):
+    """
+    Coroutine counterpart of `get_sidebar_content` from `admin_toolbox_sidebar` template tags. Result is memoized on
+    request, so awaiting it in async view (or middleware) before rendering the page lets `admin_sidebar_content` tag
+    reuse it, instead of checking permissions one by one.
+    """
+    from admin_toolbox.templatetags.admin_toolbox_sidebar import get_menu_name, get_opened, get_state_content
+
+    if context is None:
+        context = RequestContext(request)
+    menu_name = get_menu_name(context, menu_name)
+
+    try:
+        memo = request._admin_toolbox_sidebar
+    except AttributeError:
+        memo = request._admin_toolbox_sidebar = {}
+
+    if menu_name not in memo:
+        metrics.get_metrics().increment('sidebar.requests', tags={'menu': menu_name})
+        menu = await sync_to_async(menus.get_menu)(menu_name)
+        state = await build_state(menu, request, context, menu_name, get_opened(menu))
+        memo[menu_name] = get_state_content(state)
+    return memo[menu_name]
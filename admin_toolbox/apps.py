@@ -3,3 +3,15 @@ from django.apps import AppConfig
 
 class SidebarConfig(AppConfig):
     name = 'admin_toolbox'
+
+    def ready(self):
+        from django.core.signals import setting_changed
+
+        from admin_toolbox import checks, permissions, registry, settings  # noqa: F401
+        permissions.connect_signals()
+        setting_changed.connect(registry.setting_changed_receiver, dispatch_uid='admin_toolbox_settings')
+
+        if settings.warmup:
+            # apps listed after admin toolbox may still register models in admin sites, so menus are built later
+            from admin_toolbox import warmup
+            warmup.connect_signals()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Case, Count, IntegerField, Q, QuerySet, Sum, When
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+from six import string_types
+
+from admin_toolbox import metrics, settings
+
+
+class Badge(object):
+    """
+    Count of objects shown next to model entry in sidebar. Defined by dict of lookups or `Q` object filtering objects of
+    model, by queryset (of any model) or by callable taking no arguments and returning count. Querysets and callables
+    can also be given as dotted paths, so they can be set in settings. Counts are the same for all users.
+    """
+
+    def __init__(self, model, definition):
+        self.definition = definition
+        self.condition = None
+        self.queryset = None
+        self.func = None
+
+        if isinstance(definition, string_types):
+            definition = import_string(definition)
+
+        if isinstance(definition, dict):
+            self.condition = Q(**definition)
+        elif isinstance(definition, Q):
+            self.condition = definition
+        elif isinstance(definition, QuerySet):
+            self.queryset = definition
+            model = definition.model
+        elif callable(definition):
+            self.func = definition
+        else:
+            raise ImproperlyConfigured(
+                "Badge has to be dict of lookups, Q object, queryset or callable, got {!r}".format(definition)
+            )
+
+        # model which objects are counted, counts are cached and invalidated for each model
+        self.model = model
+        connect_signals(model)
+
+    def __reduce__(self):
+        return type(self), (self.model, self.definition)
+
+    def get_aggregate(self):
+        condition = self.condition
+        if self.queryset is not None:
+            condition = Q(pk__in=self.queryset.values('pk'))
+        if not condition:
+            return Count('pk')
+        return Sum(Case(When(condition, then=1), default=0, output_field=IntegerField()))
+
+
+def get_cache():
+    return caches[settings.badges_cache]
+
+
+def get_cache_key(model):
+    return 'admin_toolbox:badges:{}'.format(model._meta.label_lower)
+
+
+def invalidate(sender, **kwargs):
+    """
+    Drops cached counts of badges of model. Connected to signals sent when objects of models with badges are saved
+    or deleted.
+    """
+    get_cache().delete(get_cache_key(sender))
+
+
+def connect_signals(model):
+    post_save.connect(invalidate, sender=model, dispatch_uid='admin_toolbox_badges')
+    post_delete.connect(invalidate, sender=model, dispatch_uid='admin_toolbox_badges')
+
+
+def count(model, badges):
+    """
+    Counts badges of one model. All badges defined by lookups, `Q` objects or querysets are counted with single query,
+    using conditional aggregation.
+    """
+    counts = {}
+    aggregates = {}
+    aliases = {}
+    for badge_id, badge in badges:
+        if badge.func is not None:
+            counts[badge_id] = badge.func()
+        else:
+            alias = 'badge_{}'.format(len(aggregates))
+            aggregates[alias] = badge.get_aggregate()
+            aliases[alias] = badge_id
+
+    if aggregates:
+        result = model._default_manager.aggregate(**aggregates)
+        for alias, badge_id in aliases.items():
+            # sum over empty table is NULL
+            counts[badge_id] = result[alias] or 0
+    return counts
+
+
+def get_counts(badges):
+    """
+    Returns counts of badges, provided as dict of badge ids and badges. Counts of each model are cached together, for
+    `ADMIN_TOOLBOX['badges_cache_timeout']` seconds, and all missing ones are counted at once.
+    """
+    if not badges:
+        return {}
+
+    by_model = OrderedDict()
+    for badge_id, badge in badges.items():
+        by_model.setdefault(badge.model, []).append((badge_id, badge))
+
+    cache = get_cache()
+    cached = cache.get_many([get_cache_key(model) for model in by_model])
+    collector = metrics.get_metrics()
+    counts = {}
+
+    for model, model_badges in by_model.items():
+        key = get_cache_key(model)
+        model_counts = dict(cached.get(key) or {})
+        missing = [(badge_id, badge) for badge_id, badge in model_badges if badge_id not in model_counts]
+        collector.increment('sidebar.badges', tags={
+            'model': model._meta.label_lower,
+            'result': 'miss' if missing else 'hit',
+        })
+        if missing:
+            model_counts.update(count(model, missing))
+            cache.set(key, model_counts, settings.badges_cache_timeout)
+        for badge_id, badge in model_badges:
+            counts[badge_id] = model_counts[badge_id]
+    return counts
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from operator import itemgetter
+
+import six
+
+from admin_toolbox import registry
+from six.moves.html_entities import name2codepoint
+from six.moves.html_parser import HTMLParser
+
+SEPARATOR = '›'
+
+
+class BreadcrumbsParser(HTMLParser):
+    """
+    Extracts breadcrumbs from first `<div>` of rendered HTML in one pass. Breadcrumbs are separated by `›`. For every
+    breadcrumb that contains link, URL and text of first link are taken, for other ones just it's text.
+    """
+
+    def __init__(self):
+        if six.PY3:
+            HTMLParser.__init__(self, convert_charrefs=True)
+        else:
+            HTMLParser.__init__(self)
+        self.nodes = []
+        # depth of nested `<div>` elements inside first one, None before it is found
+        self.depth = None
+        self.finished = False
+        self.in_link = False
+        self.start_node()
+
+    def start_node(self):
+        self.seen = False
+        self.href = None
+        self.has_link = False
+        self.text = []
+        self.link_text = []
+
+    def finish_node(self):
+        if not self.seen:
+            return
+        if self.has_link:
+            self.nodes.append((self.href, ''.join(self.link_text).strip()))
+        else:
+            self.nodes.append((None, ''.join(self.text).strip()))
+
+    @property
+    def capturing(self):
+        return self.depth is not None and not self.finished
+
+    def handle_starttag(self, tag, attrs):
+        if self.finished:
+            return
+        if tag == 'div':
+            self.depth = 0 if self.depth is None else self.depth + 1
+            if self.depth == 0:
+                return
+        if not self.capturing:
+            return
+
+        self.seen = True
+        if tag == 'a' and not self.has_link:
+            self.has_link = True
+            self.in_link = True
+            self.href = dict(attrs).get('href')
+
+    def handle_startendtag(self, tag, attrs):
+        if self.capturing:
+            self.seen = True
+
+    def handle_endtag(self, tag):
+        if not self.capturing:
+            return
+        if tag == 'div':
+            if self.depth == 0:
+                self.finish_node()
+                self.finished = True
+                return
+            self.depth -= 1
+        if tag == 'a':
+            self.in_link = False
+        self.seen = True
+
+    def handle_data(self, data):
+        if not self.capturing:
+            return
+
+        for i, part in enumerate(data.split(SEPARATOR)):
+            if i:
+                self.in_link = False
+                self.finish_node()
+                self.start_node()
+            if part:
+                self.seen = True
+                self.text.append(part)
+                if self.in_link:
+                    self.link_text.append(part)
+
+    def handle_entityref(self, name):
+        # only called when charrefs are not converted automatically
+        codepoint = name2codepoint.get(name)
+        self.handle_data(six.unichr(codepoint) if codepoint else '&{};'.format(name))
+
+    def handle_charref(self, name):
+        # only called when charrefs are not converted automatically
+        if name.startswith(('x', 'X')):
+            codepoint = int(name[1:], 16)
+        else:
+            codepoint = int(name)
+        self.handle_data(six.unichr(codepoint))
+
+    def close(self):
+        HTMLParser.close(self)
+        if self.capturing:
+            self.finish_node()
+            self.finished = True
+
+
+def parse_breadcrumbs(html):
+    """
+    Returns list of `(url, title)` pairs of breadcrumbs found in rendered HTML. `url` is None for breadcrumbs that are
+    not links.
+    """
+    parser = BreadcrumbsParser()
+    parser.feed(html)
+    parser.close()
+    return parser.nodes
+
+
+def merge_active_path(nodes, active_path):
+    """
+    Replaces beginning of breadcrumbs with path to active sidebar item. Breadcrumbs after active item are kept.
+    First node (link to admin index) is always kept.
+    """
+    index_node = nodes[0]
+    urls = list(map(itemgetter(0), nodes))
+
+    if active_path and active_path[-1]['url'] in urls:
+        nodes = nodes[urls.index(active_path[-1]['url']) + 1:]
+        nodes = [index_node] + [
+            (node.get('url'), node['name']) for node in active_path
+        ] + nodes
+    elif active_path:
+        nodes = [index_node] + [
+            (node.get('url'), node['name']) for node in active_path
+        ]
+        if len(nodes) > 1:
+            nodes[-1] = (None, nodes[-1][1])
+    elif len(nodes) > 1:
+        nodes = [index_node, nodes[-1]]
+
+    return nodes
+
+
+def get_model_admin(context):
+    """
+    Finds ModelAdmin of currently rendered admin page, if there is any.
+    """
+    for holder in (context.get('cl'), context.get('adminform')):
+        model_admin = getattr(holder, 'model_admin', None)
+        if model_admin is not None:
+            return model_admin
+
+    opts = context.get('opts')
+    if opts is None:
+        return None
+
+    request = getattr(context, 'request', None)
+    admin_site = registry.find_site(getattr(request, 'current_app', None)) or registry.get_site()
+    return registry.get_index(admin_site).get_admin(opts.model)
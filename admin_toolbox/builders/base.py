@@ -3,5 +3,16 @@ class BaseBuilder(object):
     def __init__(self):
         super(BaseBuilder, self).__init__()
 
+    def is_visible(self, request=None, context=None, menu_name='default'):
+        return True
+
     def build(self, request=None, context=None, menu_name='default'):
         return {}
+
+    def abuild(self, request=None, context=None, menu_name='default'):
+        """
+        Returns coroutine building this element, for use in async code. Unless overridden, `build` is run in a thread,
+        so it doesn't block event loop. Requires python 3.5+ and asgiref.
+        """
+        from admin_toolbox import aio
+        return aio.build(self, request, context, menu_name)
@@ -3,6 +3,8 @@ from six import string_types
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.module_loading import import_string
 
+from admin_toolbox import instrumentation, metrics, permission_checks
+
 from .base import BaseBuilder
 
 
@@ -10,8 +12,13 @@ class ItemBuilder(BaseBuilder):
     """
     Simple manual element builder. You have to specify url and name of element. You can specify icon. If icon is not
     provided, will fallback to default one (determined by how much item is nested).
+
+    Result of `permissions_check` can be memoized for the whole request, for each user or for everyone, by setting
+    `permissions_check_scope` to `'request'`, `'user'` or `'global'`. Results with `user` and `global` scope are kept
+    for `permissions_check_timeout` seconds (300 by default).
     """
-    def __init__(self, url, name, icon=None, permissions_check=None, *args, **kwargs):
+    def __init__(self, url, name, icon=None, permissions_check=None, permissions_check_scope=None,
+                 permissions_check_timeout=None, *args, **kwargs):
         super(ItemBuilder, self).__init__(*args, **kwargs)
         self.url = url
         self.name = name
@@ -20,15 +27,36 @@ class ItemBuilder(BaseBuilder):
             self.permissions_check = import_string(permissions_check)
         else:
             self.permissions_check = permissions_check
+        permission_checks.validate_scope(permissions_check_scope)
+        self.permissions_check_scope = permissions_check_scope
+        self.permissions_check_timeout = permissions_check_timeout
 
     def check_permissions(self, request=None, context=None, menu_name='default'):
         if self.permissions_check is None:
             return True
-
-        return self.permissions_check(request, context, menu_name)
+        if self.permissions_check_scope is None:
+            return self.run_permissions_check(request, context, menu_name)
+
+        return permission_checks.memoize(
+            self.permissions_check, self.permissions_check_scope, self.permissions_check_timeout, request, menu_name,
+            lambda: self.run_permissions_check(request, context, menu_name),
+        )
+
+    def run_permissions_check(self, request=None, context=None, menu_name='default'):
+        metrics.get_metrics().increment('permissions.checks', tags={'kind': 'item'})
+        with instrumentation.timed_check(self.permissions_check):
+            result = self.permissions_check(request, context, menu_name)
+            if hasattr(result, '__await__'):
+                # coroutine check used outside of event loop
+                from admin_toolbox import aio
+                result = aio.run(result)
+        return result
+
+    def is_visible(self, request=None, context=None, menu_name='default'):
+        return self.check_permissions(request, context, menu_name)
 
     def build(self, request=None, context=None, menu_name='default'):
-        if self.check_permissions(request, context, menu_name):
+        if self.is_visible(request, context, menu_name):
             return {
                 'url': self.url,
                 'name': self.name,
@@ -41,9 +69,12 @@ class ListBuilder(BaseBuilder):
     Simple sub-list builder. Each sub-item must be specified manually. Elements can be of any class.
 
     Each sub-list builder must inherit by this class.
+
+    If list is `lazy`, it's items are built and rendered only when user expands it, unless it's on active branch of
+    menu.
     """
 
-    def __init__(self, items, name, icon=None, *args, **kwargs):
+    def __init__(self, items, name, icon=None, lazy=False, *args, **kwargs):
         super(ListBuilder, self).__init__(*args, **kwargs)
 
         if not isinstance(items, (list, tuple)):
@@ -74,6 +105,7 @@ class ListBuilder(BaseBuilder):
         ]
         self.name = name
         self.icon = icon
+        self.lazy = lazy
 
     def build(self, request=None, context=None, menu_name='default'):
         return {
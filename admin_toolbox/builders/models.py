@@ -1,49 +1,36 @@
 import six
-from collections import defaultdict, OrderedDict
+from collections import OrderedDict
 
 from django.apps import apps
 
-from django.contrib.admin import site
-from django.urls import reverse, NoReverseMatch
+from django.contrib.admin.options import BaseModelAdmin
+from django.utils.functional import lazy
 
+from admin_toolbox import instrumentation, metrics, registry
+from admin_toolbox.badges import Badge
+from admin_toolbox.permissions import get_evaluator
 from .generic import ItemBuilder, ListBuilder
 
 
-class ModelBuilderMixin(object):
-
-    _app_dict = None
-
-    @staticmethod
-    def get_admin_apps():
-        """
-        For not having to constantly parse admin apps list, this method caches it globally in class
-        :return:
-        """
-        if ModelBuilderMixin._app_dict is None:
+def capitalize(text):
+    return six.text_type(text).capitalize()
 
-            app_dict = defaultdict(list)
-            models = site._registry.items()
 
-            for model, model_admin in models:
-                app_label = model._meta.app_label
-                model_name = model._meta.object_name
-                model_path = '.'.join([app_label, model_name])
+# menus are compiled once, so names of models have to be translated when they're rendered, not when they're built
+lazy_capitalize = lazy(capitalize, six.text_type)
 
-                app_dict[app_label].append({
-                    'name': model._meta.verbose_name_plural,
-                    'app_label': app_label,
-                    'model_name': model_name,
-                    'model_path': model_path,
-                })
 
-            app_dict = OrderedDict(sorted(six.iteritems(app_dict), key=lambda x: x[0].lower()))
-
-            for models in six.itervalues(app_dict):
-                models.sort(key=lambda x: x['name'])
+class ModelBuilderMixin(object):
 
-            ModelBuilderMixin._app_dict = app_dict
+    site = None
 
-        return ModelBuilderMixin._app_dict
+    def get_admin_apps(self):
+        """
+        For not having to constantly parse admin apps list, this method uses index of admin site's registry, which is
+        built only once and rebuilt when registry changes.
+        :return:
+        """
+        return registry.get_index(self.site).app_dict
 
     def filter_app_models(self, models, fltr=None, exclude=None):
         if fltr is not None:
@@ -74,10 +61,14 @@ class ModelBuilder(ModelBuilderMixin, ItemBuilder):
     Element builder based on specified model class. URL will point to registered ModelAdmin for specified Model. Name
     will default to model's `verbose_name`. Icon will default to model's `menu_icon` or to default one (determined by
     how much item is nested) if `menu_icon` not provided in model's Meta.
+
+    `badge` adds count of objects next to the entry, see `admin_toolbox.badges.Badge` for how it can be defined.
     """
 
-    def __init__(self, model_path, name=None, icon=None, *args, **kwargs):
+    def __init__(self, model_path, name=None, icon=None, site=None, badge=None, *args, **kwargs):
         super(ModelBuilder, self).__init__(url=None, name=name, icon=icon, *args, **kwargs)
+        self.site = registry.get_site(site)
+        self.badge = None
         app_name, model_name = model_path.rsplit('.', 2)[-2:]
         try:
             app = apps.get_app_config(app_name)
@@ -97,36 +88,55 @@ class ModelBuilder(ModelBuilderMixin, ItemBuilder):
                 except AttributeError:
                     return
 
-        self.admin = site._registry.get(model)
+        index = registry.get_index(self.site)
+        self.admin = index.get_admin(model)
         if self.admin is None:
             return
+        self.app_label = model._meta.app_label
+        # module permission can be evaluated for whole app at once, unless ModelAdmin customizes it
+        self.default_module_permission = (
+            six.get_unbound_function(type(self.admin).has_module_permission) is
+            six.get_unbound_function(BaseModelAdmin.has_module_permission)
+        )
         opts = model._meta
         meta = getattr(model, 'Meta', None)
 
-        try:
-            self.url = reverse('admin:{opts.app_label}_{opts.model_name}_changelist'.format(opts=opts))
-        except NoReverseMatch:
+        self.url = index.get_changelist_url(model)
+        if self.url is None:
             return
 
-        self.name = name or opts.verbose_name_plural.capitalize()
+        self.name = name or lazy_capitalize(opts.verbose_name_plural)
         self.icon = icon or getattr(meta, '_menu_icon', None) or getattr(meta, 'menu_icon', None)
+        if badge is not None:
+            self.badge = Badge(model, badge)
 
-    def build(self, request=None, context=None, menu_name='default'):
+    def has_module_permission(self, request):
+        metrics.get_metrics().increment('permissions.checks', tags={'kind': 'module'})
+        if self.default_module_permission:
+            return get_evaluator(request).has_module_perms(self.app_label)
+        with instrumentation.timed_check(self.admin.has_module_permission):
+            return self.admin.has_module_permission(request)
+
+    def is_visible(self, request=None, context=None, menu_name='default'):
         if self.url is None:
-            return None
-        if request and not self.admin.has_module_permission(request):
-            return None
-        return super(ModelBuilder, self).build(context, menu_name)
+            return False
+        if request and not self.has_module_permission(request):
+            return False
+        return super(ModelBuilder, self).is_visible(request, context, menu_name)
 
 
 class ModelsListBuilder(ModelBuilderMixin, ListBuilder):
     """
     Generates menu items from app models. Each subelement will represent one model from specified app. You can also
+
+    `badges` can map model names (with or without app label) to badges of their entries.
     """
 
-    def __init__(self, app_name, models=None, exclude=None, name=None, icon=None, items=None, *args, **kwargs):
+    def __init__(self, app_name, models=None, exclude=None, name=None, icon=None, items=None, site=None, badges=None,
+                 *args, **kwargs):
         if items is None:
             items = []
+        self.site = registry.get_site(site)
 
         super(ModelsListBuilder, self).__init__(name=name, icon=icon, items=items, *args, **kwargs)
 
@@ -148,12 +158,28 @@ class ModelsListBuilder(ModelBuilderMixin, ListBuilder):
         self.name = self.name or app_config.verbose_name
         self.icon = self.icon or getattr(app_config, 'menu_icon', None)
 
+        badges = dict(
+            (('.'.join([app_name, model]) if '.' not in model else model).lower(), badge)
+            for model, badge in six.iteritems(badges or {})
+        )
+
         self.items = list(self.items) + [
             ModelBuilder(
-                model_path=model['model_path']
+                model_path=model['model_path'],
+                site=self.site,
+                badge=badges.get(model['model_path'].lower()),
             ) for model in models
         ]
 
+    def is_visible(self, request=None, context=None, menu_name='default'):
+        """
+        Used for lazy lists, which items are not checked until list is expanded. List of models is visible if any of
+        them is, lists with other items are always visible.
+        """
+        if not all(type(item) is ModelBuilder for item in self.items):
+            return True
+        return any(item.is_visible(request, context, menu_name) for item in self.items)
+
 
 class AppsListBuilder(ModelBuilderMixin, ListBuilder):
     """
@@ -166,17 +192,25 @@ class AppsListBuilder(ModelBuilderMixin, ListBuilder):
 
     Apps and exclude can also take models, in form `app_label.model_name`. That way, you can include or exclude only
     particular models.
+
+    If `lazy` is set, lists of apps are lazy as well. `badges` can map models, in form `app_label.model_name`, to badges
+    of their entries.
     """
 
-    def __init__(self, name, apps=None, exclude=None, icon=None, items=None, *args, **kwargs):
+    def __init__(self, name, apps=None, exclude=None, icon=None, items=None, site=None, lazy=False, badges=None, *args,
+                 **kwargs):
         if items is None:
             items = []
-        super(AppsListBuilder, self).__init__(name=name, icon=icon, items=items, *args, **kwargs)
+        self.site = registry.get_site(site)
+        super(AppsListBuilder, self).__init__(name=name, icon=icon, items=items, lazy=lazy, *args, **kwargs)
         apps = self.get_admin_apps_filtered(filter=apps, exclude=exclude)
 
         self.items = list(self.items) + [
             ModelsListBuilder(
                 app_name=app_name,
                 models=[model['model_path'] for model in models],
+                site=self.site,
+                lazy=lazy,
+                badges=badges,
             ) for app_name, models in six.iteritems(apps)
         ]
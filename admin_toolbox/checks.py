@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings as django_settings
+from django.core import checks
+from django.urls import NoReverseMatch, reverse
+
+from admin_toolbox import menus, settings
+
+
+@checks.register('admin_toolbox')
+def check_settings(app_configs, **kwargs):
+    errors = []
+    if settings.breadcrumbs not in [None, 'auto', 'auto-smart', 'smart', 'force-smart']:
+        errors.append(checks.Error(
+            "ADMIN_TOOLBOX['breadcrumbs'] must be one of: [None, 'auto', 'auto-smart', 'smart', 'force-smart']",
+            id='admin_toolbox.E001',
+        ))
+    if settings.sidebar_mode not in ['server', 'client']:
+        errors.append(checks.Error(
+            "ADMIN_TOOLBOX['sidebar_mode'] must be one of: ['server', 'client']",
+            id='admin_toolbox.E002',
+        ))
+    if settings.permissions_cache_timeout and is_local_cache(settings.permissions_cache):
+        errors.append(checks.Warning(
+            "ADMIN_TOOLBOX['permissions_cache'] uses local memory cache, so permissions changed in one process are "
+            "memoized by other processes for up to ADMIN_TOOLBOX['permissions_cache_timeout'] seconds",
+            hint="Use cache shared by all processes, like memcached, redis or database cache.",
+            id='admin_toolbox.W001',
+        ))
+    return errors
+
+
+def is_local_cache(alias):
+    return django_settings.CACHES.get(alias, {}).get('BACKEND') == 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@checks.register('admin_toolbox')
+def check_menus(app_configs, **kwargs):
+    """
+    Builds every configured menu, so invalid one is reported before it is used.
+    """
+    errors = []
+    for menu_name in settings.sidebar:
+        try:
+            menu = menus.get_menu(menu_name)
+        except Exception as e:
+            errors.append(checks.Error(
+                "Menu '{}' of ADMIN_TOOLBOX['sidebar'] cannot be built: {!r}".format(menu_name, e),
+                id='admin_toolbox.E003',
+            ))
+            continue
+
+        # features of menu, together with endpoints they use
+        features = []
+        if menu.lazy_nodes:
+            features.append(('has lazy lists', 'admin_toolbox:menu'))
+        if settings.sidebar_mode == 'client':
+            features.append(('is rendered in client mode', 'admin_toolbox:menu'))
+        if settings.sidebar_search:
+            features.append(('can be filtered', 'admin_toolbox:search'))
+
+        missing = []
+        for feature, url_name in features:
+            try:
+                reverse(url_name, kwargs={'menu_name': menu_name})
+            except NoReverseMatch:
+                missing.append(feature)
+        if missing:
+            errors.append(checks.Error(
+                "Menu '{}' of ADMIN_TOOLBOX['sidebar'] {}, which requires 'admin_toolbox.urls' to be included in URL "
+                "conf".format(menu_name, ' and '.join(missing)),
+                id='admin_toolbox.E004',
+            ))
+    return errors
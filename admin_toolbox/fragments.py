@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import re
+
+from django.core.cache import caches
+from django.utils.translation import get_language
+from six import text_type
+
+from admin_toolbox import metrics, settings
+from admin_toolbox.nodes import BoundNode
+
+# number of menu levels rendered by `admin_toolbox/sidebar.html`, `None` if all levels are rendered
+RENDERED_LEVELS = 3
+
+# placeholder of active state of item, rendered into cached sidebar and replaced when it's used
+SLOT = '{{su-slot:{}}}'
+SLOT_RE = re.compile(r'\{su-slot:([0-9-]+)\}')
+
+
+def get_cache():
+    return caches[settings.sidebar_cache]
+
+
+def describe_items(items):
+    """
+    Returns JSON-serializable description of everything in items that affects rendered sidebar, except of active state.
+    Each item is described by name, URL, icon and sub-items, followed by URL of items of lazy list which items are not
+    built and badge, if item has any of them.
+    """
+    description = []
+    for item in items:
+        row = [
+            text_type(item.get('name')),
+            item.get('url') and text_type(item['url']),
+            item.get('icon') and text_type(item['icon']),
+            describe_items(item['items']) if item.get('items') else None,
+        ]
+        subtree_url = item.get('subtree_url')
+        badge = item.get('badge')
+        if badge is not None:
+            row.extend((subtree_url and text_type(subtree_url), badge))
+        elif subtree_url:
+            row.append(text_type(subtree_url))
+        description.append(row)
+    return description
+
+
+def get_fragment_key(menu_name, state, levels=RENDERED_LEVELS, search_url=None):
+    """
+    Cache key of rendered sidebar. It depends on version of menu as seen by the user, on menu name, number of rendered
+    levels and URL of search index.
+    """
+    return 'admin_toolbox:sidebar:{}:{}:{}:{}'.format(menu_name, levels, get_menu_version(state), search_url or '')
+
+
+def get_menu_version(state, node=None):
+    """
+    Strong validator of menu as seen by the user, or of items of lazy list `node` if it's specified. It changes when
+    menu changes, when set of items visible to the user changes (for example when user's permissions change), with
+    counts of badges, lazy lists which items are not built and current language. It's the same in all processes
+    serving the same menu.
+    """
+    digest = hashlib.md5(get_state_version(state).encode('utf-8'))
+    if node is not None:
+        digest.update('node:{}'.format(node.index).encode('utf-8'))
+    if state.badges:
+        digest.update(json.dumps(sorted(state.badges.items())).encode('utf-8'))
+    if state.deferred:
+        digest.update(json.dumps(sorted(state.deferred)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def get_state_version(state):
+    """
+    Strong validator of set of items kept in state of menu. Kept nodes of compiled menu are identified just by flags of
+    state, only items built by dynamic nodes have to be described.
+    """
+    digest = hashlib.md5('{}:{}:'.format(state.menu.get_digest(), get_language()).encode('utf-8'))
+    digest.update(bytes(state.flags))
+    if state.expanded:
+        digest.update(json.dumps(describe_items([
+            BoundNode(node, state) for index, node in sorted(state.expanded.items(), key=lambda pair: pair[0])
+        ])).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SlottedItem(object):
+    """
+    Item rendered into cached sidebar. It's never active, instead it provides `active_slot`, placeholder of it's active
+    state identified by positions of item and it's ancestors.
+    """
+    __slots__ = ('item', 'path')
+
+    def __init__(self, item, path):
+        self.item = item
+        self.path = path
+
+    def __getitem__(self, key):
+        if key == 'active_slot':
+            return SLOT.format('-'.join(map(text_type, self.path)))
+        if key == 'active':
+            raise KeyError(key)
+        if key == 'items':
+            items = self.item['items']
+            return [SlottedItem(item, self.path + (position,)) for position, item in enumerate(items)]
+        return self.item[key]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def get_slotted_items(items):
+    return [SlottedItem(item, (position,)) for position, item in enumerate(items)]
+
+
+def mark_active(html, active_index):
+    """
+    Replaces placeholders of active state in cached sidebar, marking items on path given by `active_index`.
+    """
+    active = set('-'.join(map(text_type, active_index[:length])) for length in range(1, len(active_index) + 1))
+
+    def replace(match):
+        return 'active' if match.group(1) in active else ''
+
+    return SLOT_RE.sub(replace, html)
+
+
+def render_cached(menu_name, content, render, levels=RENDERED_LEVELS):
+    """
+    Returns rendered sidebar from cache or renders it, using `render` callable, and stores it in cache. Sidebar is
+    rendered and cached with placeholders instead of active state of items, which are replaced afterwards. If template
+    doesn't render placeholders, sidebar with active items is rendered without cache.
+    """
+    state, active_index = content['state'], content['active_index']
+    cache = get_cache()
+    key = get_fragment_key(menu_name, state, levels, content.get('search_url'))
+
+    html = cache.get(key)
+    metrics.get_metrics().increment('sidebar.cache', tags={
+        'menu': menu_name,
+        'result': 'miss' if html is None else 'hit',
+    })
+    if html is None:
+        html = text_type(render(dict(content, items=get_slotted_items(state.inactive().items), active_path=[])))
+        cache.set(key, html, settings.sidebar_cache_timeout)
+
+    if active_index and '{su-slot:' not in html:
+        return render(dict(content))
+    return mark_active(html, active_index)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from timeit import default_timer
+
+from six import string_types
+
+try:
+    from asgiref.local import Local
+except ImportError:
+    from threading import local as Local
+
+_local = Local()
+
+
+class Recorder(object):
+    """
+    Collects timings of admin toolbox during one request: of each phase (compiling menu, evaluating permissions, walking
+    menu tree, rendering sidebar, parsing breadcrumbs), of each builder class and of each permission check.
+    """
+
+    def __init__(self):
+        self.phases = OrderedDict()
+        self.builders = {}
+        self.permission_checks = {}
+        # phases may be nested (permissions are resolved while walking menu tree), so total counts outermost ones only
+        self.total = 0.0
+        self.depth = 0
+
+    @staticmethod
+    def add(bucket, name, duration):
+        entry = bucket.get(name)
+        if entry is None:
+            bucket[name] = [duration, 1]
+        else:
+            entry[0] += duration
+            entry[1] += 1
+
+    def add_phase(self, name, duration):
+        self.add(self.phases, name, duration)
+
+    def add_builder(self, builder, duration):
+        self.add(self.builders, get_name(type(builder)), duration)
+
+    def add_permission_check(self, check, duration):
+        self.add(self.permission_checks, check if isinstance(check, string_types) else get_name(check), duration)
+
+    @staticmethod
+    def slowest(bucket, limit=None):
+        """
+        Returns list of `(name, total duration, count)` tuples, slowest first.
+        """
+        entries = sorted(
+            ((name, total, count) for name, (total, count) in bucket.items()),
+            key=lambda entry: -entry[1],
+        )
+        return entries[:limit] if limit is not None else entries
+
+    def server_timing(self):
+        """
+        Returns value of `Server-Timing` header with all recorded phases.
+        """
+        return ', '.join(
+            'toolbox-{};dur={:.3f}'.format(name, total * 1000) for name, (total, count) in self.phases.items()
+        )
+
+
+def get_recorder():
+    return getattr(_local, 'recorder', None)
+
+
+@contextmanager
+def recording():
+    """
+    Enables recording in current request (or thread) for the time of the block. If recording is already enabled,
+    existing recorder is reused.
+    """
+    recorder = get_recorder()
+    if recorder is not None:
+        yield recorder
+        return
+
+    recorder = _local.recorder = Recorder()
+    try:
+        yield recorder
+    finally:
+        _local.recorder = None
+
+
+def get_name(obj):
+    """
+    Returns dotted path of class or function, used as name of builder or permission check.
+    """
+    if not isinstance(obj, type) and not hasattr(obj, '__name__'):
+        obj = type(obj)
+    return '.'.join([getattr(obj, '__module__', None) or '?', getattr(obj, '__qualname__', None) or obj.__name__])
+
+
+@contextmanager
+def _timed(add, name):
+    recorder = get_recorder()
+    if recorder is None:
+        yield
+        return
+
+    start = default_timer()
+    try:
+        yield
+    finally:
+        add(recorder, name, default_timer() - start)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Records duration of the block as specified phase, if recording is enabled.
+    """
+    recorder = get_recorder()
+    if recorder is None:
+        yield
+        return
+
+    start = default_timer()
+    recorder.depth += 1
+    try:
+        yield
+    finally:
+        duration = default_timer() - start
+        recorder.depth -= 1
+        recorder.add_phase(phase, duration)
+        if not recorder.depth:
+            recorder.total += duration
+
+
+def timed_builder(builder):
+    """
+    Records duration of the block as time spent in class of specified builder, if recording is enabled.
+    """
+    return _timed(Recorder.add_builder, builder)
+
+
+def timed_check(check):
+    """
+    Records duration of the block as time spent in specified permission check (callable or it's name), if recording
+    is enabled.
+    """
+    return _timed(Recorder.add_permission_check, check)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_toolbox import settings
+from admin_toolbox.warmup import build_menu
+
+
+class Command(BaseCommand):
+    help = "Builds all menus configured in ADMIN_TOOLBOX['sidebar'] and prints their sizes and build times."
+
+    def add_arguments(self, parser):
+        parser.add_argument('menus', nargs='*', help='names of menus to build (all of them by default)')
+
+    def handle(self, *args, **options):
+        menu_names = options['menus'] or list(settings.sidebar)
+        failed = []
+
+        for menu_name in menu_names:
+            if menu_name not in settings.sidebar:
+                raise CommandError("There is no menu named '{}'".format(menu_name))
+            try:
+                menu, duration = build_menu(menu_name)
+            except Exception as e:
+                failed.append(menu_name)
+                self.stderr.write("{}: {!r}".format(menu_name, e))
+                continue
+
+            self.stdout.write("{}: {} nodes ({} built on each request), {:.1f} ms".format(
+                menu_name, len(menu.nodes), sum(1 for node in menu.nodes if node.dynamic), duration * 1000,
+            ))
+
+        if failed:
+            raise CommandError("Menus cannot be built: {}".format(', '.join(failed)))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_toolbox import menus, settings, snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Compiles all menus configured in ADMIN_TOOLBOX['sidebar'] and writes them to snapshot file, which is loaded "
+        "instead of compiling menus when ADMIN_TOOLBOX['menu_snapshot'] is set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="path of snapshot file (ADMIN_TOOLBOX['menu_snapshot'] by default)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.menu_snapshot
+        if not path:
+            raise CommandError("Provide path of snapshot file or set ADMIN_TOOLBOX['menu_snapshot']")
+
+        compiled = []
+        for menu_name in settings.sidebar:
+            try:
+                compiled.append(menus.compile_menu(menu_name))
+            except Exception as e:
+                raise CommandError("{}: {!r}".format(menu_name, e))
+
+        snapshot, skipped = snapshots.make_snapshot(compiled)
+        snapshots.write_snapshot(snapshot, path)
+
+        for menu_name in settings.sidebar:
+            if menu_name in skipped:
+                self.stdout.write("{}: skipped, {}".format(menu_name, skipped[menu_name]))
+            else:
+                self.stdout.write("{}: {} nodes".format(menu_name, len(snapshot['menus'][menu_name])))
+        self.stdout.write("Snapshot written to {}".format(path))
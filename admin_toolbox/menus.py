@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from django.utils.translation import get_language
+from six import string_types, text_type
+
+from admin_toolbox import instrumentation, metrics, registry, settings
+from admin_toolbox.nodes import compile_nodes
+from admin_toolbox.urlindex import URLPrefixIndex
+
+_menus = {}
+_lock = threading.Lock()
+
+
+def get_menu_config(menu_name):
+    """
+    Returns normalized 2-tuple of builder class path and builder kwargs for menu from `ADMIN_TOOLBOX['sidebar']`.
+    Returned kwargs are a copy, so settings are never mutated.
+    """
+    config = settings.sidebar.get(menu_name)
+
+    if isinstance(config, string_types):
+        config = (config, {})
+
+    if not isinstance(config, (list, tuple)) or len(config) != 2:
+        raise ImproperlyConfigured(menu_name)
+
+    builder_class_path, builder_kwargs = config
+    builder_kwargs = dict(builder_kwargs)
+    builder_kwargs.setdefault('name', 'Django admin')
+
+    return builder_class_path, builder_kwargs
+
+
+class CompiledMenu(object):
+    """
+    Menu compiled from builder tree into flat tuple of immutable nodes, together with index of all URLs that are known
+    before building it. Compiled menu is never altered, so it can be shared between requests and threads. State of each
+    request is held separately, in `MenuState`.
+    """
+
+    def __init__(self, name, builder, registry_version, nodes=None):
+        self.name = name
+        self.builder = builder
+        self.registry_version = registry_version
+        self.nodes = compile_nodes(builder) if nodes is None else nodes
+        self.url_index = URLPrefixIndex(
+            node.url for node in self.nodes if not node.is_list and isinstance(node.url, string_types)
+        )
+        self.lazy_nodes = tuple(node.index for node in self.nodes if node.lazy)
+        self.badges = dict(
+            (node.index, node.builder.badge) for node in self.nodes
+            if not node.is_list and not node.dynamic and getattr(node.builder, 'badge', None) is not None
+        )
+        # whether version of memoized permissions checks has to be known when building menu
+        self.memoized_checks = any(
+            getattr(node.builder, 'permissions_check_scope', None) in ('user', 'global') for node in self.nodes
+        )
+        # indexes of lazy lists holding each URL, so branch which may be active can be built
+        self.lazy_urls = {}
+        for node in self.nodes:
+            if node.is_list or not isinstance(node.url, string_types):
+                continue
+            parent = node.parent
+            while parent is not None:
+                if parent.lazy:
+                    self.lazy_urls.setdefault(node.url, set()).add(parent.index)
+                parent = parent.parent
+        self._digests = {}
+
+    def get_digest(self):
+        """
+        Digest of structure, names, URLs and icons of all nodes, in current language. Unlike `registry_version`, it's
+        the same in all processes that compiled menu the same way.
+        """
+        language = get_language()
+        digest = self._digests.get(language)
+        if digest is None:
+            digest = self._digests[language] = hashlib.md5(json.dumps([
+                [
+                    node.parent.index if node.parent is not None else None,
+                    node.name and text_type(node.name),
+                    node.url and text_type(node.url),
+                    node.icon and text_type(node.icon),
+                    node.dynamic,
+                ]
+                for node in self.nodes
+            ]).encode('utf-8')).hexdigest()
+        return digest
+
+
+def compile_menu(menu_name):
+    """
+    Constructs whole builder tree of specified menu.
+    """
+    builder_class_path, builder_kwargs = get_menu_config(menu_name)
+    builder_class = import_string(builder_class_path)
+    tags = {'menu': menu_name}
+    collector = metrics.get_metrics()
+    collector.increment('menu.compiles', tags=tags)
+    with instrumentation.timed('compile'), collector.timer('menu.compile_seconds', tags):
+        builder = builder_class(**builder_kwargs)
+        # building menu may create registry indexes, so version is taken afterwards
+        return CompiledMenu(menu_name, builder, registry.get_version())
+
+
+def load_menu(menu_name):
+    """
+    Loads menu from snapshot set in `ADMIN_TOOLBOX['menu_snapshot']`, compiling it only if it's not in snapshot or
+    snapshot doesn't match current registry or settings.
+    """
+    from admin_toolbox import snapshots
+
+    nodes = snapshots.load_menu(menu_name)
+    metrics.get_metrics().increment('menu.snapshot', tags={
+        'menu': menu_name,
+        'result': 'fallback' if nodes is None else 'loaded',
+    })
+    if nodes is None:
+        return compile_menu(menu_name)
+    return CompiledMenu(menu_name, None, registry.get_version(), nodes)
+
+
+def get_menu(menu_name):
+    """
+    Returns compiled menu, compiling it first if it is used for the first time in this process or if admin registry
+    indexes were rebuilt since it was compiled. Menus hold reversed URLs, so they are compiled separately for each
+    script prefix and URL conf.
+    """
+    key = (menu_name,) + registry.get_url_key()
+    menu = _menus.get(key)
+    if menu is not None and menu.registry_version == registry.get_version():
+        return menu
+
+    with _lock:
+        menu = _menus.get(key)
+        if menu is None or menu.registry_version != registry.get_version():
+            menu = _menus[key] = (load_menu if settings.menu_snapshot else compile_menu)(menu_name)
+        return menu
+
+
+def invalidate(menu_name=None):
+    """
+    Drops compiled menu (or all of them, if `menu_name` is not provided), so it will be compiled again on next use.
+    """
+    with _lock:
+        if menu_name is None:
+            _menus.clear()
+        else:
+            for key in [key for key in _menus if key[0] == menu_name]:
+                del _menus[key]
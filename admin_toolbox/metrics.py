@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from timeit import default_timer
+
+from django.utils.module_loading import import_string
+from six import string_types
+
+from admin_toolbox import settings
+
+_metrics = None
+_lock = threading.Lock()
+
+
+class Metrics(object):
+    """
+    Interface of metrics collector. Admin toolbox emits counters (`increment`) and values of histograms (`observe`,
+    durations are in seconds). Tags are dict of additional dimensions of metric, like menu name. Set
+    `ADMIN_TOOLBOX['metrics']` to dotted path of subclass (or instance of it) to collect them.
+
+    Emitted metrics:
+
+    - `menu.compiles` (counter, tag `menu`) and `menu.compile_seconds` (histogram, tag `menu`),
+    - `menu.snapshot` (counter, tags `menu` and `result`, which is `loaded` or `fallback`),
+    - `sidebar.requests` (counter, tag `menu`) and `sidebar.visibility_checks` (histogram of number of builder checks
+      done in one request, tag `menu`),
+    - `sidebar.cache` (counter, tags `menu` and `result`, which is `hit` or `miss`),
+    - `sidebar.badges` (counter, tags `model` and `result`, which is `hit` or `miss`),
+    - `permissions.checks` (counter, tag `kind`) and `permissions.memo` (counter, tag `result`),
+    - `permissions.checks_memo` (counter, tags `scope` and `result`),
+    - `breadcrumbs.requests` (counter, tag `source`, which is `structured` or `parsed`) and
+      `breadcrumbs.parse_seconds` (histogram).
+    """
+
+    def increment(self, name, value=1, tags=None):
+        raise NotImplementedError
+
+    def observe(self, name, value, tags=None):
+        raise NotImplementedError
+
+    @contextmanager
+    def timer(self, name, tags=None):
+        """
+        Observes duration of the block, in seconds.
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.observe(name, default_timer() - start, tags)
+
+
+class NullMetrics(Metrics):
+    """
+    Default collector, ignores all metrics.
+    """
+
+    def increment(self, name, value=1, tags=None):
+        pass
+
+    def observe(self, name, value, tags=None):
+        pass
+
+    @contextmanager
+    def timer(self, name, tags=None):
+        yield
+
+
+class InMemoryMetrics(Metrics):
+    """
+    Keeps all metrics in memory of current process, so they can be scraped or checked in tests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    @staticmethod
+    def get_key(name, tags):
+        return (name, tuple(sorted(tags.items())) if tags else ())
+
+    def increment(self, name, value=1, tags=None):
+        key = self.get_key(name, tags)
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, tags=None):
+        key = self.get_key(name, tags)
+        with self.lock:
+            self.histograms[key].append(value)
+
+    def get_counter(self, name, tags=None):
+        """
+        Returns value of counter, for specified tags or summed for all tags if they are not provided.
+        """
+        with self.lock:
+            if tags is not None:
+                return self.counters.get(self.get_key(name, tags), 0)
+            return sum(value for (key_name, key_tags), value in self.counters.items() if key_name == name)
+
+    def get_values(self, name, tags=None):
+        """
+        Returns all observed values of histogram, for specified tags or for all tags if they are not provided.
+        """
+        with self.lock:
+            if tags is not None:
+                return list(self.histograms.get(self.get_key(name, tags), ()))
+            return [
+                value
+                for (key_name, key_tags), values in self.histograms.items() if key_name == name
+                for value in values
+            ]
+
+    def snapshot(self):
+        """
+        Returns copy of all counters and histograms, keyed by 2-tuples of name and sorted tags.
+        """
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': dict((key, list(values)) for key, values in self.histograms.items()),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(int)
+            self.histograms = defaultdict(list)
+
+
+def load_metrics():
+    metrics = settings.metrics
+    if metrics is None:
+        return NullMetrics()
+    if isinstance(metrics, string_types):
+        metrics = import_string(metrics)
+    if isinstance(metrics, type):
+        metrics = metrics()
+    return metrics
+
+
+def get_metrics():
+    """
+    Returns collector configured in `ADMIN_TOOLBOX['metrics']`, it is created once per process.
+    """
+    global _metrics
+    metrics = _metrics
+    if metrics is not None:
+        return metrics
+
+    with _lock:
+        if _metrics is None:
+            _metrics = load_metrics()
+        return _metrics
+
+
+def reset():
+    """
+    Drops configured collector, so it will be loaded again from settings on next use.
+    """
+    global _metrics
+    with _lock:
+        _metrics = None
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from admin_toolbox import instrumentation
+
+
+class ServerTimingMiddleware(object):
+    """
+    Records timings of admin toolbox during each request and emits them in `Server-Timing` response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with instrumentation.recording() as recorder:
+            response = self.get_response(request)
+
+        server_timing = recorder.server_timing()
+        if server_timing:
+            if response.has_header('Server-Timing'):
+                server_timing = ', '.join([response['Server-Timing'], server_timing])
+            response['Server-Timing'] = server_timing
+        return response
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.urls import reverse
+from six import get_unbound_function, string_types
+
+from admin_toolbox import badges, instrumentation, metrics
+from admin_toolbox.builders import ItemBuilder, ListBuilder
+
+VISIBLE = 1
+
+
+class MenuNode(object):
+    """
+    Immutable node of compiled menu. Nodes of compiled menu are kept in flat tuple, in order they appear in menu, and
+    `index` is position of node in it. Nodes generated on request by builders that cannot be compiled (transient
+    nodes) have no index. `children` is None for items and tuple of nodes for lists.
+    """
+    __slots__ = ('index', 'parent', 'children', 'url', 'name', 'icon', 'builder', 'dynamic', 'data', 'lazy')
+
+    def __init__(self, index, parent, url=None, name=None, icon=None, builder=None, dynamic=False, data=None,
+                 lazy=False):
+        self.index = index
+        self.parent = parent
+        self.children = None
+        self.url = url
+        self.name = name
+        self.icon = icon
+        self.builder = builder
+        # dynamic node is replaced on each request by result of it's builder's `build`
+        self.dynamic = dynamic
+        # original dict built for transient node
+        self.data = data
+        # items of lazy list are built only when it's expanded, unless it's on active branch
+        self.lazy = lazy
+
+    @property
+    def is_list(self):
+        return self.children is not None
+
+
+def is_static_item(builder):
+    return isinstance(builder, ItemBuilder) and (
+        get_unbound_function(type(builder).build) is get_unbound_function(ItemBuilder.build)
+    )
+
+
+def is_static_list(builder):
+    return isinstance(builder, ListBuilder) and (
+        get_unbound_function(type(builder).build) is get_unbound_function(ListBuilder.build) and
+        get_unbound_function(type(builder).build_items) is get_unbound_function(ListBuilder.build_items)
+    )
+
+
+def compile_nodes(builder):
+    """
+    Compiles builder tree into flat tuple of nodes. Builders that don't override how items are built are compiled
+    into nodes once, all other ones become dynamic nodes, which are built on each request. Only lists that are not
+    root of menu and have any items in them can be lazy.
+    """
+    nodes = []
+
+    def add(builder, parent):
+        index = len(nodes)
+        if is_static_list(builder):
+            node = MenuNode(index, parent, name=builder.name, icon=builder.icon, builder=builder)
+            nodes.append(node)
+            node.children = tuple(add(item, node) for item in builder.items)
+            node.lazy = parent is not None and getattr(builder, 'lazy', False) and any(
+                not descendant.is_list for descendant in nodes[index + 1:]
+            )
+        elif is_static_item(builder):
+            node = MenuNode(index, parent, url=builder.url, name=builder.name, icon=builder.icon, builder=builder)
+            nodes.append(node)
+        else:
+            node = MenuNode(index, parent, builder=builder, dynamic=True)
+            nodes.append(node)
+        return node
+
+    add(builder, None)
+    return tuple(nodes)
+
+
+class MenuState(object):
+    """
+    Per-request overlay over compiled menu. Holds visibility flag of every node, results of dynamic nodes built for
+    this request, path of active nodes, lazy lists which items are not built and counts of badges. Compiled menu itself
+    is never altered.
+    """
+    __slots__ = ('menu', 'flags', 'expanded', 'active_path', 'urls', 'deferred', 'badges', '_menu_url')
+
+    def __init__(self, menu, flags=None, expanded=None, active_path=(), urls=None, deferred=None, badges=None):
+        self.menu = menu
+        self.flags = bytearray(len(menu.nodes)) if flags is None else flags
+        # transient nodes built for dynamic nodes, by index of dynamic node
+        self.expanded = {} if expanded is None else expanded
+        self.active_path = active_path
+        # URLs kept in menu, mapped to nodes that hold them
+        self.urls = {} if urls is None else urls
+        # indexes of kept lazy lists which items are not built
+        self.deferred = frozenset() if deferred is None else deferred
+        # counts of badges of kept items, by index of item
+        self.badges = {} if badges is None else badges
+        self._menu_url = None
+
+    @classmethod
+    def build(cls, menu, request=None, context=None, menu_name='default', opened=None):
+        state = cls(menu)
+        with instrumentation.timed('tree'):
+            state.compact(request, context, menu_name, opened=opened)
+        state.count_badges()
+        return state
+
+    def inactive(self):
+        """
+        Returns same state, but without any active node.
+        """
+        return type(self)(self.menu, self.flags, self.expanded, (), self.urls, self.deferred, self.badges)
+
+    def count_badges(self):
+        """
+        Counts badges of all kept items at once.
+        """
+        menu = self.menu
+        if not menu.badges:
+            return
+        flags = self.flags
+        # badges are cached under ids that are the same in all processes, kept items have unique URLs
+        ids = dict(('{}:{}'.format(menu.name, menu.nodes[index].url), index) for index in menu.badges if flags[index])
+        with instrumentation.timed('badges'):
+            counts = badges.get_counts(dict((badge_id, menu.badges[index]) for badge_id, index in ids.items()))
+        self.badges = dict((ids[badge_id], value) for badge_id, value in counts.items())
+
+    def defer(self, current_url=None, opened=None):
+        """
+        Decides which lazy lists are built. By default, only lazy lists on branches that may be active for current URL
+        are, `opened` can provide indexes of lazy lists to build instead. Returns indexes of all lists which items are
+        not built, lazy lists closest to the root among them are kept in `deferred`.
+        """
+        menu = self.menu
+        hidden = set()
+        if not menu.lazy_nodes:
+            return hidden
+
+        if opened is None:
+            opened = set()
+            if current_url is not None:
+                for url in menu.url_index.match(current_url):
+                    opened.update(menu.lazy_urls.get(url, ()))
+
+        deferred = set()
+        for node in menu.nodes:
+            if not node.is_list or node.parent is None:
+                continue
+            if node.parent.index in hidden:
+                hidden.add(node.index)
+            elif node.lazy and node.index not in opened:
+                hidden.add(node.index)
+                deferred.add(node.index)
+        self.deferred = frozenset(deferred)
+        return hidden
+
+    def subtree_url(self, node):
+        """
+        Returns URL of endpoint providing items of deferred list.
+        """
+        if self._menu_url is None:
+            self._menu_url = reverse('admin_toolbox:menu', kwargs={'menu_name': self.menu.name})
+        return '{}?node={}'.format(self._menu_url, node.index)
+
+    def compact(self, request, context, menu_name, results=None, opened=None):
+        """
+        Decides which nodes are kept in menu and which one is active, in single pass through menu, in order of it's
+        items. Item is kept if it's visible and it's URL was not used by any kept item before. List is kept if any of
+        it's children is kept, so when item is kept, all of it's ancestors that are not marked yet are marked as kept
+        too - every list is marked at most once, so whole pass takes linear time. Active node is the one with longest
+        URL that current URL starts with. Items of deferred lazy lists are not checked at all, only `is_visible` of
+        lazy list itself is called.
+
+        If `results` are provided, they are used instead of calling builders. They should map index of each dynamic
+        node to result of it's `build` and index of each item and deferred list to result of it's `is_visible`.
+        """
+        flags = self.flags
+        urls = self.urls
+        url_index = self.menu.url_index
+        current_url = getattr(request, 'path', None)
+        hidden = self.defer(current_url, opened)
+        deferred = self.deferred
+
+        # URLs from compiled menu that current URL starts with, mapped to their length
+        candidates = {}
+        if current_url is not None:
+            candidates = dict((url, len(url)) for url in url_index.match(current_url))
+        # most specific active node found so far and length of it's URL
+        active = [None, -1]
+
+        def keep_ancestors(node):
+            parent = node.parent
+            while parent is not None and parent.index is not None and not flags[parent.index]:
+                flags[parent.index] = VISIBLE
+                parent = parent.parent
+
+        def track_active(node):
+            url = node.url
+            length = candidates.get(url)
+            if length is None:
+                if (
+                    current_url is None or url in url_index or not isinstance(url, string_types) or
+                    not current_url.startswith(url)
+                ):
+                    return
+                length = len(url)
+            if length > active[1]:
+                active[0], active[1] = node, length
+
+        def convert(item, parent):
+            """
+            Converts item built by dynamic node into transient nodes, keeping them by the same rules as compiled ones.
+            """
+            if item is None:
+                return None
+
+            node = MenuNode(None, parent, url=item.get('url'), name=item.get('name'), icon=item.get('icon'), data=item)
+
+            if 'items' in item:
+                children = tuple(
+                    child for child in (convert(sub, node) for sub in item['items']) if child is not None
+                )
+                if not children:
+                    return None
+                node.children = children
+            elif 'url' in item:
+                if node.url in urls:
+                    return None
+                urls[node.url] = node
+                track_active(node)
+
+            return node
+
+        if results is not None:
+            def call(node, method):
+                return results[node.index]
+        elif instrumentation.get_recorder() is None:
+            def call(node, method):
+                return method(request, context, menu_name)
+        else:
+            def call(node, method):
+                with instrumentation.timed_builder(node.builder):
+                    return method(request, context, menu_name)
+
+        checks = 0
+        for node in self.menu.nodes:
+            if hidden and node.parent is not None and node.parent.index in hidden:
+                continue
+            if node.dynamic:
+                checks += 1
+                transient = convert(call(node, node.builder.build), node.parent)
+                if transient is not None:
+                    self.expanded[node.index] = transient
+                    keep_ancestors(node)
+            elif not node.is_list:
+                if node.url in urls:
+                    continue
+                checks += 1
+                if not call(node, node.builder.is_visible):
+                    continue
+                flags[node.index] = VISIBLE
+                urls[node.url] = node
+                keep_ancestors(node)
+                track_active(node)
+            elif node.index in deferred:
+                checks += 1
+                if node.builder is not None and not call(node, node.builder.is_visible):
+                    continue
+                flags[node.index] = VISIBLE
+                keep_ancestors(node)
+
+        path = []
+        node = active[0]
+        while node is not None and node.parent is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        self.active_path = tuple(path)
+
+        metrics.get_metrics().observe('sidebar.visibility_checks', checks, {'menu': menu_name})
+
+    def is_visible(self, node):
+        return node.index is None or bool(self.flags[node.index])
+
+    def children(self, node):
+        """
+        Returns children of node that are kept in menu for this request.
+        """
+        if node.index is None:
+            return node.children
+
+        flags = self.flags
+        children = []
+        for child in node.children:
+            if child.dynamic:
+                transient = self.expanded.get(child.index)
+                if transient is not None:
+                    children.append(transient)
+            elif flags[child.index]:
+                children.append(child)
+        return children
+
+    @property
+    def items(self):
+        """
+        Top level items of menu, bound to this state.
+        """
+        return [BoundNode(node, self) for node in self.root_children()]
+
+    def root_children(self):
+        root = self.menu.nodes[0]
+        if root.dynamic:
+            transient = self.expanded.get(root.index)
+            return transient.children if transient is not None and transient.is_list else ()
+        return self.children(root)
+
+    @property
+    def bound_active_path(self):
+        return [BoundNode(node, self) for node in self.active_path]
+
+    @property
+    def active_index(self):
+        """
+        Positions of nodes of active path among kept children of their parents.
+        """
+        index = []
+        siblings = self.root_children()
+        for node in self.active_path:
+            position = next(i for i, sibling in enumerate(siblings) if sibling is node)
+            index.append(position)
+            siblings = self.children(node) if node.is_list else ()
+        return tuple(index)
+
+
+class BoundNode(object):
+    """
+    Node bound to state of current request. Can be used as dict built by builders, so it can be used in templates.
+    """
+    __slots__ = ('node', 'state', '_items')
+
+    def __init__(self, node, state):
+        self.node = node
+        self.state = state
+        self._items = None
+
+    def __repr__(self):
+        return '<BoundNode {!r}>'.format(self.name)
+
+    def __eq__(self, other):
+        return isinstance(other, BoundNode) and self.node is other.node and self.state is other.state
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.node)
+
+    @property
+    def url(self):
+        return self.node.url
+
+    @property
+    def name(self):
+        return self.node.name
+
+    @property
+    def icon(self):
+        return self.node.icon
+
+    @property
+    def active(self):
+        return self.node in self.state.active_path
+
+    @property
+    def badge(self):
+        return self.state.badges.get(self.node.index)
+
+    @property
+    def subtree_url(self):
+        if self.node.index in self.state.deferred:
+            return self.state.subtree_url(self.node)
+        return None
+
+    @property
+    def items(self):
+        if not self.node.is_list:
+            return None
+        if self._items is None:
+            self._items = [BoundNode(child, self.state) for child in self.state.children(self.node)]
+        return self._items
+
+    def __getitem__(self, key):
+        node = self.node
+        if key == 'name' or key == 'icon':
+            return getattr(node, key)
+        if key == 'items':
+            if node.is_list:
+                return self.items
+        elif key == 'url':
+            if not node.is_list:
+                return node.url
+        elif key == 'active':
+            if self.active:
+                return True
+        elif key == 'subtree_url':
+            if node.index in self.state.deferred:
+                return self.subtree_url
+        elif key == 'badge':
+            if node.index in self.state.badges:
+                return self.state.badges[node.index]
+        elif node.data is not None and key in node.data:
+            return node.data[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
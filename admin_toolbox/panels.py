@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from debug_toolbar.panels import Panel
+from django.utils.translation import gettext_lazy as _
+
+from admin_toolbox import instrumentation
+
+SLOWEST_LIMIT = 20
+
+
+def as_rows(entries):
+    return [
+        {'name': name, 'duration': total * 1000, 'count': count}
+        for name, total, count in entries
+    ]
+
+
+class ToolboxPanel(Panel):
+    """
+    django-debug-toolbar panel showing time spent in each phase of admin toolbox and the slowest builders and
+    permission checks. Add `'admin_toolbox.panels.ToolboxPanel'` to `DEBUG_TOOLBAR_PANELS` to use it.
+    """
+    title = _('Admin toolbox')
+    template = 'admin_toolbox/debug_toolbar_panel.html'
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        if not stats.get('phases'):
+            return ''
+        return '{:.2f} ms'.format(stats['total'])
+
+    def process_request(self, request):
+        with instrumentation.recording() as recorder:
+            response = super(ToolboxPanel, self).process_request(request)
+        self.recorder = recorder
+        return response
+
+    def generate_stats(self, request, response):
+        recorder = getattr(self, 'recorder', None)
+        if recorder is None:
+            return
+        self.record_stats({
+            'total': recorder.total * 1000,
+            'phases': as_rows(recorder.slowest(recorder.phases)),
+            'builders': as_rows(recorder.slowest(recorder.builders, SLOWEST_LIMIT)),
+            'permission_checks': as_rows(recorder.slowest(recorder.permission_checks, SLOWEST_LIMIT)),
+        })
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Memoizing results of `permissions_check` of items, under scope declared by item. Results with `request` scope are kept
+on request, results with `user` and `global` scope are kept in bounded memo of process, until their timeout passes or
+until they're invalidated with `invalidate()`.
+"""
+from __future__ import unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from admin_toolbox import metrics, settings
+
+SCOPES = ('request', 'user', 'global')
+VERSION_CACHE_KEY = 'admin_toolbox:permissions_checks_version'
+MEMO_SIZE = 4096
+DEFAULT_TIMEOUT = 300
+
+MISSING = object()
+
+_memo = OrderedDict()
+_lock = threading.Lock()
+
+
+def validate_scope(scope):
+    if scope is not None and scope not in SCOPES:
+        raise ImproperlyConfigured(
+            "`permissions_check_scope` has to be one of {}, got {!r}".format(', '.join(SCOPES), scope)
+        )
+
+
+def get_version(request=None):
+    """
+    Returns current version of memoized results. It is kept in django cache specified by
+    `ADMIN_TOOLBOX['permissions_cache']`, so invalidation reaches all processes, and is read once per request.
+    """
+    version = getattr(request, '_admin_toolbox_checks_version', None)
+    if version is None:
+        cache = caches[settings.permissions_cache]
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            version = time.time()
+            cache.add(VERSION_CACHE_KEY, version, None)
+        if request is not None:
+            request._admin_toolbox_checks_version = version
+    return version
+
+
+def invalidate():
+    """
+    Drops all memoized results of checks with `user` and `global` scope, in all processes sharing the cache.
+    """
+    caches[settings.permissions_cache].set(VERSION_CACHE_KEY, time.time(), None)
+    clear()
+
+
+def clear():
+    with _lock:
+        _memo.clear()
+
+
+def get_key(check, scope, request=None, menu_name='default'):
+    """
+    Returns key under which result of check is memoized, or None if it cannot be memoized for this request.
+    """
+    if scope == 'request':
+        return (check, menu_name) if request is not None else None
+    if scope == 'user':
+        user_pk = getattr(getattr(request, 'user', None), 'pk', None)
+        if user_pk is None:
+            return None
+        return (check, menu_name, user_pk, get_version(request))
+    return (check, menu_name, None, get_version(request))
+
+
+def lookup(key, scope, request=None):
+    """
+    Returns memoized result of check or `MISSING`.
+    """
+    if scope == 'request':
+        result = getattr(request, '_admin_toolbox_checks', {}).get(key, MISSING)
+    else:
+        with _lock:
+            memoized = _memo.get(key)
+        result = memoized[1] if memoized is not None and memoized[0] > time.time() else MISSING
+    metrics.get_metrics().increment('permissions.checks_memo', tags={
+        'scope': scope,
+        'result': 'miss' if result is MISSING else 'hit',
+    })
+    return result
+
+
+def store(key, scope, result, timeout=None, request=None):
+    if scope == 'request':
+        try:
+            memo = request._admin_toolbox_checks
+        except AttributeError:
+            memo = request._admin_toolbox_checks = {}
+        memo[key] = result
+        return
+
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+    with _lock:
+        _memo.pop(key, None)
+        _memo[key] = (time.time() + timeout, result)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def memoize(check, scope, timeout, request, menu_name, compute):
+    """
+    Returns result of check memoized under it's scope, calling `compute` if there is none.
+    """
+    key = get_key(check, scope, request, menu_name)
+    if key is None:
+        return compute()
+
+    result = lookup(key, scope, request)
+    if result is MISSING:
+        result = compute()
+        store(key, scope, result, timeout, request)
+    return result
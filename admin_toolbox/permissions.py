@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_backends, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import AnonymousUser, Group, Permission, PermissionsMixin
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from six import get_unbound_function
+
+from admin_toolbox import instrumentation, metrics, settings
+
+VERSION_CACHE_KEY = 'admin_toolbox:permissions_version'
+MEMO_SIZE = 1024
+
+_memo = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_version():
+    """
+    Returns current permissions version. It is kept in django cache, so it is shared by all processes using the same
+    cache.
+    """
+    cache = caches[settings.permissions_cache]
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = time.time()
+        cache.add(VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def bump_version(*args, **kwargs):
+    """
+    Invalidates all memoized permissions. Connected to signals sent when permissions of any user may change, has to be
+    called after changes that don't send them.
+    """
+    caches[settings.permissions_cache].set(VERSION_CACHE_KEY, time.time(), None)
+    with _lock:
+        _memo.clear()
+
+
+def connect_signals():
+    user_model = get_user_model()
+    for through in (
+        getattr(getattr(user_model, 'groups', None), 'through', None),
+        getattr(getattr(user_model, 'user_permissions', None), 'through', None),
+        Group.permissions.through,
+    ):
+        if through is not None:
+            m2m_changed.connect(bump_version, sender=through, dispatch_uid='admin_toolbox_permissions')
+    for model in (Group, Permission):
+        post_save.connect(bump_version, sender=model, dispatch_uid='admin_toolbox_permissions')
+        post_delete.connect(bump_version, sender=model, dispatch_uid='admin_toolbox_permissions')
+
+
+class PermissionEvaluator(object):
+    """
+    Evaluates module permissions of one user. Every app label is checked only once and, if all authentication backends
+    are ones that check module permissions same way as `ModelBackend` does, all of them are resolved at once from
+    user's permission set. Results can also be memoized between requests for each user and permissions version, for
+    `ADMIN_TOOLBOX['permissions_cache_timeout']` seconds (not memoized by default).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.memo_key = None
+
+        if settings.permissions_cache_timeout and getattr(user, 'pk', None) is not None:
+            self.memo_key = (user.pk, user.is_active, getattr(user, 'is_superuser', False), get_version())
+            with _lock:
+                memoized = _memo.get(self.memo_key)
+            hit = memoized is not None and memoized[0] > time.time()
+            metrics.get_metrics().increment('permissions.memo', tags={'result': 'hit' if hit else 'miss'})
+            if hit:
+                self.module_perms = memoized[1]
+                return
+
+        self.module_perms = self.resolve_module_perms()
+        if self.memo_key is not None:
+            self.memoize()
+
+    def memoize(self):
+        with _lock:
+            _memo[self.memo_key] = (time.time() + settings.permissions_cache_timeout, self.module_perms)
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+
+    def resolve_module_perms(self):
+        """
+        Returns set of app labels user has module permissions for, True if user has all of them or empty dict, which
+        will be filled in by checking each app label separately, if it cannot be determined at once.
+        """
+        user = self.user
+        if not self.stock_checks(user):
+            return {}
+
+        if not user.is_active:
+            return frozenset()
+        if user.is_superuser:
+            return True
+
+        return frozenset(
+            perm.split('.', 1)[0]
+            for backend in get_backends() if hasattr(backend, 'has_module_perms')
+            for perm in backend.get_all_permissions(user)
+        )
+
+    @staticmethod
+    def stock_checks(user):
+        """
+        Determines if module permissions of user are checked by django's default implementation only.
+        """
+        if get_unbound_function(user.__class__.has_module_perms) not in (
+            get_unbound_function(PermissionsMixin.has_module_perms),
+            get_unbound_function(AnonymousUser.has_module_perms),
+        ):
+            return False
+
+        model_backend_check = get_unbound_function(ModelBackend.has_module_perms)
+        return all(
+            get_unbound_function(type(backend).has_module_perms) is model_backend_check
+            for backend in get_backends() if hasattr(backend, 'has_module_perms')
+        )
+
+    def has_module_perms(self, app_label):
+        module_perms = self.module_perms
+
+        if module_perms is True:
+            return True
+        if isinstance(module_perms, frozenset):
+            return app_label in module_perms
+
+        try:
+            return module_perms[app_label]
+        except KeyError:
+            pass
+        # dict is shared with other requests of the same user, but it's only filled in with final values
+        with instrumentation.timed_check(self.user.has_module_perms):
+            result = module_perms[app_label] = self.user.has_module_perms(app_label)
+        return result
+
+
+def get_evaluator(request):
+    """
+    Returns permission evaluator for user of current request, creating it if it's used first time in this request.
+    """
+    try:
+        return request._admin_toolbox_permissions
+    except AttributeError:
+        with instrumentation.timed('permissions'):
+            evaluator = request._admin_toolbox_permissions = PermissionEvaluator(request.user)
+        return evaluator
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import itertools
+import threading
+from collections import defaultdict, OrderedDict
+
+import six
+from django.conf import settings as django_settings
+from django.contrib.admin import site as default_site
+from django.contrib.admin.options import ModelAdmin
+from django.contrib.admin.sites import AdminSite, all_sites
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf, reverse
+
+from admin_toolbox import metrics, settings
+
+_versions = itertools.count(1)
+_version = next(_versions)
+_indexes = {}
+_lock = threading.Lock()
+
+
+def find_site(name):
+    """
+    Returns admin site with specified name or None, if there is no such site.
+    """
+    if default_site.name == name:
+        return default_site
+    for admin_site in all_sites:
+        if admin_site.name == name:
+            return admin_site
+    return None
+
+
+def get_site(admin_site=None):
+    """
+    Returns admin site from it's name or instance. Defaults to `django.contrib.admin.site`.
+    """
+    if admin_site is None:
+        return default_site
+    if isinstance(admin_site, AdminSite):
+        return admin_site
+
+    found = find_site(admin_site)
+    if found is None:
+        raise ImproperlyConfigured("There is no admin site named '{}'".format(admin_site))
+    return found
+
+
+def get_url_key():
+    """
+    Returns script prefix and URL conf of current request (or thread). Everything that holds reversed URLs has to be
+    kept separately for each of them. URL conf is None outside of request unless it's set explicitly, but reversing
+    uses `ROOT_URLCONF` then, same as requests that don't override it, so both share the same key.
+    """
+    return get_script_prefix(), get_urlconf() or django_settings.ROOT_URLCONF
+
+
+def overrides(obj, attr, base):
+    """
+    Checks if class of object (which may be lazy object) defines attribute anywhere below base class.
+    """
+    for klass in obj.__class__.__mro__:
+        if attr in vars(klass):
+            return klass is not base
+    return False
+
+
+class RegistryIndex(object):
+    """
+    Index of models registered in one admin site, grouped by app label, together with their model admins and URLs of
+    their changelists. Index remembers state of registry it was built from, so it can detect when models were
+    registered or unregistered after that. URLs are resolved separately for each script prefix and URL conf.
+    """
+
+    def __init__(self, admin_site, version):
+        self.site = admin_site
+        self.snapshot = dict(admin_site._registry)
+        self.version = version
+        self.app_dict = self.build_app_dict()
+        self.changelist_urls = {}
+
+    def is_current(self):
+        return self.site._registry == self.snapshot
+
+    def get_admin(self, model):
+        return self.snapshot.get(model)
+
+    def get_changelist_urls(self):
+        key = get_url_key()
+        urls = self.changelist_urls.get(key)
+        if urls is None:
+            urls = self.changelist_urls[key] = self.build_changelist_urls()
+        return urls
+
+    def get_changelist_url(self, model):
+        return self.get_changelist_urls().get(model)
+
+    def build_app_dict(self):
+        app_dict = defaultdict(list)
+
+        for model, model_admin in six.iteritems(self.snapshot):
+            app_label = model._meta.app_label
+            model_name = model._meta.object_name
+            model_path = '.'.join([app_label, model_name])
+
+            app_dict[app_label].append({
+                'name': model._meta.verbose_name_plural,
+                'app_label': app_label,
+                'model_name': model_name,
+                'model_path': model_path,
+            })
+
+        app_dict = OrderedDict(sorted(six.iteritems(app_dict), key=lambda x: x[0].lower()))
+
+        for models in six.itervalues(app_dict):
+            models.sort(key=lambda x: x['name'])
+
+        return app_dict
+
+    def build_changelist_urls(self):
+        """
+        Returns URLs of changelists of all registered models. Unless admin site or model admin customizes it's URLs,
+        changelist URL is derived from URL of admin site's index, as URLs of all changelists are placed under it, so
+        only one URL has to be reversed.
+        """
+        root = None
+        if not overrides(self.site, 'get_urls', AdminSite) and not overrides(self.site, 'urls', AdminSite):
+            try:
+                root = reverse('{}:index'.format(self.site.name))
+            except NoReverseMatch:
+                pass
+
+        urls = {}
+        for model, model_admin in six.iteritems(self.snapshot):
+            opts = model._meta
+            if (
+                root is not None and not overrides(model_admin, 'get_urls', ModelAdmin) and
+                not overrides(model_admin, 'urls', ModelAdmin)
+            ):
+                urls[model] = '{}{}/{}/'.format(root, opts.app_label, opts.model_name)
+                continue
+
+            try:
+                urls[model] = reverse('{site.name}:{opts.app_label}_{opts.model_name}_changelist'.format(
+                    site=self.site, opts=opts,
+                ))
+            except NoReverseMatch:
+                urls[model] = None
+        return urls
+
+
+def get_index(admin_site=None):
+    """
+    Returns registry index of admin site, building it first if it doesn't exist yet or admin registry changed since it
+    was built.
+    """
+    global _version
+
+    admin_site = get_site(admin_site)
+
+    index = _indexes.get(admin_site)
+    if index is not None and index.is_current():
+        return index
+
+    with _lock:
+        index = _indexes.get(admin_site)
+        if index is None or not index.is_current():
+            _version = next(_versions)
+            index = _indexes[admin_site] = RegistryIndex(admin_site, _version)
+        return index
+
+
+def get_version():
+    """
+    Returns version of all registry indexes. It changes every time any of indexes is rebuilt or invalidated.
+    """
+    for admin_site in list(_indexes):
+        get_index(admin_site)
+    return _version
+
+
+def invalidate():
+    """
+    Drops all registry indexes. Indexes will be rebuilt on next use and every cache depending on them (like compiled
+    menus) will be rebuilt as well.
+    """
+    global _version
+
+    with _lock:
+        _indexes.clear()
+        _version = next(_versions)
+
+
+def setting_changed_receiver(setting, **kwargs):
+    if setting == 'ADMIN_TOOLBOX':
+        from admin_toolbox import permission_checks, snapshots
+
+        six.moves.reload_module(settings)
+        metrics.reset()
+        snapshots.reset()
+        permission_checks.clear()
+        invalidate()
+    elif setting == 'ROOT_URLCONF':
+        invalidate()
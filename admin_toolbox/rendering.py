@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+
+try:
+    from html import escape as escape_text
+except ImportError:
+    from cgi import escape as cgi_escape
+
+    def escape_text(text):
+        return cgi_escape(text, quote=True).replace("'", '&#x27;')
+
+from django.utils.safestring import mark_safe
+from six import text_type
+
+from admin_toolbox.nodes import BoundNode
+
+SIDEBAR_TEMPLATE = 'admin_toolbox/sidebar.html'
+BREADCRUMBS_TEMPLATE = 'admin_toolbox/breadcrumbs.html'
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# default icons of items on each level of menu, last one is used for all deeper levels
+LEVEL_ICONS = ('angle-right', 'angle-double-right', 'angle-triple-right')
+
+
+def uses_default_template(engine, template_name=SIDEBAR_TEMPLATE):
+    """
+    Checks if template (`admin_toolbox/sidebar.html` by default) is the one shipped with admin toolbox. If it's
+    overridden, sidebar or breadcrumbs have to be rendered by the template.
+    """
+    origin = getattr(engine.get_template(template_name), 'origin', None)
+    name = getattr(origin, 'name', None)
+    return name is not None and os.path.abspath(name) == os.path.join(TEMPLATES_DIR, template_name)
+
+
+def escape(value):
+    """
+    Same as `conditional_escape` from django, without overhead of supporting lazy strings, as it's called for every
+    rendered value.
+    """
+    if hasattr(value, '__html__'):
+        return value.__html__()
+    return escape_text(text_type(value))
+
+
+def render_items(items, level, out):
+    default_icon = LEVEL_ICONS[min(level, len(LEVEL_ICONS)) - 1]
+    for item in items:
+        sub_items = item.get('items')
+        icon = item.get('icon') or default_icon
+        if item.get('subtree_url'):
+            render_deferred(out, item['subtree_url'], item.get('name'), icon)
+            continue
+        render_item(
+            out, item.get('active') or item.get('active_slot'), item.get('url'), item.get('name'), icon, sub_items,
+            item.get('badge'),
+        )
+        if sub_items:
+            render_items(sub_items, level + 1, out)
+            out.append('</ul></li>')
+
+
+def render_nodes(state, nodes, level, active, out):
+    default_icon = LEVEL_ICONS[min(level, len(LEVEL_ICONS)) - 1]
+    deferred = state.deferred
+    badges = state.badges
+    for node in nodes:
+        if node.index in deferred:
+            render_deferred(out, state.subtree_url(node), node.name, node.icon or default_icon)
+            continue
+        children = state.children(node) if node.is_list else None
+        render_item(
+            out, node in active, node.url, node.name, node.icon or default_icon, children, badges.get(node.index),
+        )
+        if children:
+            render_nodes(state, children, level + 1, active, out)
+            out.append('</ul></li>')
+
+
+def render_item(out, active, url, name, icon, sub_items, badge=None):
+    """
+    Renders item, leaving it open if it has sub-items. `active` can also be placeholder of active state, rendered
+    instead of class.
+    """
+    if active is True:
+        out.append('<li class="active">')
+    elif active:
+        out.extend(('<li class="', active, '">'))
+    else:
+        out.append('<li class="">')
+    if sub_items:
+        out.append('<a href="#" class="with-subitems">')
+    else:
+        out.extend(('<a href="', escape(url), '">'))
+    out.extend(('<i class="fa fa-', escape(icon), '"></i>', escape(name)))
+    if badge is not None:
+        out.extend(('<span class="su-badge">', escape(badge), '</span>'))
+    out.append('</a>')
+    out.append('<ul>' if sub_items else '</li>')
+
+
+def render_deferred(out, subtree_url, name, icon):
+    """
+    Renders lazy list with empty sub-list, which is filled in by `admin-sidebar.js` when list is expanded.
+    """
+    out.extend((
+        '<li class=""><a href="#" class="with-subitems" data-subtree-url="', escape(subtree_url), '">',
+        '<i class="fa fa-', escape(icon), '"></i>', escape(name), '</a><ul></ul></li>',
+    ))
+
+
+def render_sidebar(items, search_url=None):
+    """
+    Renders sidebar with same markup as `admin_toolbox/sidebar.html` does, but without whitespace between tags and
+    with any number of levels. It's much faster than rendering the template. Items can be either dicts built by
+    builders or items of `MenuState`.
+    """
+    if search_url:
+        out = ['<div id="su-sidebar" data-search-url="', escape(search_url), '"><ul class="su-sidebar-menu">']
+    else:
+        out = ['<div id="su-sidebar"><ul class="su-sidebar-menu">']
+    if items and isinstance(items[0], BoundNode):
+        state = items[0].state
+        render_nodes(state, [item.node for item in items], 1, frozenset(state.active_path), out)
+    else:
+        render_items(items, 1, out)
+    out.append('</ul></div>')
+    return mark_safe(''.join(out))
+
+
+def render_breadcrumbs(nodes):
+    """
+    Renders breadcrumbs, given as `(url, title)` pairs, same way as `admin_toolbox/breadcrumbs.html` template does.
+    """
+    out = []
+    for url, title in nodes:
+        if url is None:
+            out.append(escape(title))
+        else:
+            out.append('<a href="{}">{}</a>'.format(escape(url), escape(title)))
+    return mark_safe('<div class="breadcrumbs">{}</div>'.format(' &rsaquo; '.join(out)))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import unicodedata
+
+from six import text_type
+
+
+def normalize(text):
+    """
+    Lowercases text and strips accents from it, so it can be matched by simple substring search.
+    """
+    text = unicodedata.normalize('NFKD', text_type(text))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def get_index(items):
+    """
+    Returns search index of items, as dict of groups and entries. Entries are all items with URL, described by name,
+    URL, position of their group (or None for top level items) and normalized name. Groups are paths of lists holding
+    entries, described by names of lists joined with ` / ` and it's normalized form.
+    """
+    groups = []
+    entries = []
+
+    def walk(items, path):
+        group = None
+        for item in items:
+            name = text_type(item.get('name'))
+            sub_items = item.get('items')
+            if sub_items:
+                walk(sub_items, path + [name])
+            elif item.get('url'):
+                if group is None and path:
+                    group = len(groups)
+                    group_name = ' / '.join(path)
+                    groups.append([group_name, normalize(group_name)])
+                entries.append([name, text_type(item['url']), group, normalize(name)])
+
+    walk(items, [])
+    return {'groups': groups, 'entries': entries}
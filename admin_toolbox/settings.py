@@ -7,3 +7,22 @@ sidebar = ADMIN_TOOLBOX.get('sidebar', {
 })
 
 breadcrumbs = ADMIN_TOOLBOX.get('breadcrumbs', 'auto')
+
+permissions_cache = ADMIN_TOOLBOX.get('permissions_cache', 'default')
+permissions_cache_timeout = ADMIN_TOOLBOX.get('permissions_cache_timeout', 0)
+
+sidebar_cache = ADMIN_TOOLBOX.get('sidebar_cache', None)
+sidebar_cache_timeout = ADMIN_TOOLBOX.get('sidebar_cache_timeout', 3600)
+
+metrics = ADMIN_TOOLBOX.get('metrics', None)
+
+sidebar_mode = ADMIN_TOOLBOX.get('sidebar_mode', 'server')
+
+warmup = ADMIN_TOOLBOX.get('warmup', False)
+
+menu_snapshot = ADMIN_TOOLBOX.get('menu_snapshot', None)
+
+badges_cache = ADMIN_TOOLBOX.get('badges_cache', 'default')
+badges_cache_timeout = ADMIN_TOOLBOX.get('badges_cache_timeout', 60)
+
+sidebar_search = ADMIN_TOOLBOX.get('sidebar_search', False)
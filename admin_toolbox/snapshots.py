@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import hashlib
+import os
+import pickle
+import threading
+
+from django.contrib.admin.sites import all_sites
+from django.urls import NoReverseMatch, get_resolver, get_urlconf, reverse
+from six import get_unbound_function
+
+from admin_toolbox import metrics, registry, settings
+from admin_toolbox.builders import ItemBuilder, ModelBuilder, ModelsListBuilder
+from admin_toolbox.builders.base import BaseBuilder
+from admin_toolbox.nodes import MenuNode
+from admin_toolbox.permissions import get_evaluator
+
+# version of snapshot file format, snapshots in any other format are ignored
+FORMAT = 2
+PICKLE_PROTOCOL = 2
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class NotSnapshotable(Exception):
+    pass
+
+
+class SnapshotItemBuilder(ItemBuilder):
+    """
+    Builder of items of menu loaded from snapshot. It checks the same permissions as `ItemBuilder` or `ModelBuilder`
+    it was made from.
+    """
+
+    def __init__(self, url, name, icon=None, permissions_check=None, app_label=None, badge=None,
+                 permissions_check_scope=None, permissions_check_timeout=None):
+        super(SnapshotItemBuilder, self).__init__(
+            url=url, name=name, icon=icon, permissions_check=permissions_check,
+            permissions_check_scope=permissions_check_scope, permissions_check_timeout=permissions_check_timeout,
+        )
+        self.app_label = app_label
+        self.badge = badge
+
+    def has_module_permission(self, request):
+        metrics.get_metrics().increment('permissions.checks', tags={'kind': 'module'})
+        return get_evaluator(request).has_module_perms(self.app_label)
+
+    def is_visible(self, request=None, context=None, menu_name='default'):
+        if self.app_label is not None and request and not self.has_module_permission(request):
+            return False
+        return super(SnapshotItemBuilder, self).is_visible(request, context, menu_name)
+
+
+class SnapshotListBuilder(BaseBuilder):
+    """
+    Builder of lazy lists of models loaded from snapshot. Same as `ModelsListBuilder`, it's visible if any of it's
+    items is.
+    """
+
+    def __init__(self, items):
+        super(SnapshotListBuilder, self).__init__()
+        self.items = items
+
+    def is_visible(self, request=None, context=None, menu_name='default'):
+        return any(item.is_visible(request, context, menu_name) for item in self.items)
+
+
+def get_registry_fingerprint():
+    """
+    Fingerprint of models and model admins registered in all admin sites, together with URLs of admin sites.
+    """
+    # admin sites may be created when URL conf is imported
+    get_resolver(get_urlconf()).url_patterns
+    state = []
+    for admin_site in list(all_sites):
+        try:
+            url = reverse('{}:index'.format(admin_site.name))
+        except NoReverseMatch:
+            url = None
+        state.append((admin_site.name, url, sorted(
+            (model._meta.label_lower, '.'.join([type(model_admin).__module__, type(model_admin).__name__]))
+            for model, model_admin in admin_site._registry.items()
+        )))
+    state.sort(key=lambda site_state: site_state[0])
+    return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()
+
+
+def get_settings_fingerprint():
+    """
+    Fingerprint of `ADMIN_TOOLBOX['sidebar']`, or None if it cannot be computed.
+    """
+    try:
+        return hashlib.sha1(pickle.dumps(settings.sidebar, PICKLE_PROTOCOL)).hexdigest()
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def check_permissions_check(check):
+    if check is None:
+        return
+    try:
+        pickle.dumps(check, PICKLE_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        raise NotSnapshotable('permissions check {!r} cannot be imported by path'.format(check))
+
+
+def serialize_menu(menu):
+    """
+    Returns list of records describing nodes of compiled menu. Raises `NotSnapshotable` if menu contains nodes that
+    have to be built on each request or custom item builders.
+    """
+    records = []
+    for node in menu.nodes:
+        record = {
+            'index': node.index,
+            'parent': node.parent.index if node.parent is not None else None,
+            'list': node.is_list,
+            'lazy': node.lazy,
+            'name': node.name,
+            'icon': node.icon,
+        }
+        if node.dynamic:
+            raise NotSnapshotable('{!r} is built on each request'.format(node.builder))
+
+        if node.lazy:
+            builder = node.builder
+            if type(builder) is ModelsListBuilder:
+                record['models'] = all(type(item) is ModelBuilder for item in builder.items)
+            elif get_unbound_function(type(builder).is_visible) is not get_unbound_function(BaseBuilder.is_visible):
+                raise NotSnapshotable('{!r} is custom lazy list'.format(builder))
+
+        if not node.is_list:
+            builder = node.builder
+            builder_class = type(builder)
+            if builder_class is ModelBuilder:
+                if builder.url is None:
+                    # never visible
+                    continue
+                if not builder.default_module_permission:
+                    raise NotSnapshotable('{!r} customizes has_module_permission'.format(builder.admin))
+                if builder.badge is not None and builder.badge.queryset is not None:
+                    raise NotSnapshotable('badge of {!r} is queryset'.format(builder.admin))
+                record['app_label'] = builder.app_label
+                record['badge'] = builder.badge
+            elif builder_class is SnapshotItemBuilder:
+                record['app_label'] = builder.app_label
+                record['badge'] = builder.badge
+            elif builder_class is not ItemBuilder:
+                raise NotSnapshotable('{!r} is custom builder'.format(builder))
+
+            check_permissions_check(builder.permissions_check)
+            record['url'] = node.url
+            record['permissions_check'] = builder.permissions_check
+            record['permissions_check_scope'] = builder.permissions_check_scope
+            record['permissions_check_timeout'] = builder.permissions_check_timeout
+
+        records.append(record)
+    return records
+
+
+def load_nodes(records):
+    """
+    Creates nodes of compiled menu from records made by `serialize_menu`.
+    """
+    nodes = []
+    by_index = {}
+    for record in records:
+        parent = by_index.get(record['parent'])
+        index = len(nodes)
+        if record['list']:
+            # items of list of models are filled in when all nodes are created
+            builder = SnapshotListBuilder([]) if record.get('models') else None
+            node = MenuNode(index, parent, name=record['name'], icon=record['icon'], builder=builder,
+                            lazy=record['lazy'])
+            node.children = []
+        else:
+            builder = SnapshotItemBuilder(
+                record['url'], record['name'], record['icon'], record['permissions_check'], record.get('app_label'),
+                record.get('badge'), record.get('permissions_check_scope'), record.get('permissions_check_timeout'),
+            )
+            node = MenuNode(index, parent, url=record['url'], name=record['name'], icon=record['icon'],
+                            builder=builder)
+        nodes.append(node)
+        by_index[record['index']] = node
+        if parent is not None:
+            parent.children.append(node)
+
+    for node in nodes:
+        if node.children is not None:
+            node.children = tuple(node.children)
+            if node.builder is not None:
+                node.builder.items = [child.builder for child in node.children]
+    return tuple(nodes)
+
+
+def make_snapshot(compiled_menus):
+    """
+    Returns snapshot of compiled menus, as dict that can be written by `write_snapshot`, and dict of reasons why menus
+    that cannot be put in snapshot were skipped.
+    """
+    snapshot = {
+        'format': FORMAT,
+        'url_key': registry.get_url_key(),
+        'registry': get_registry_fingerprint(),
+        'settings': get_settings_fingerprint(),
+        'menus': {},
+    }
+    skipped = {}
+    for menu in compiled_menus:
+        try:
+            records = serialize_menu(menu)
+            pickle.dumps(records, PICKLE_PROTOCOL)
+        except NotSnapshotable as e:
+            skipped[menu.name] = str(e)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            skipped[menu.name] = repr(e)
+        else:
+            snapshot['menus'][menu.name] = records
+    return snapshot, skipped
+
+
+def write_snapshot(snapshot, path):
+    temporary_path = '{}.tmp{}'.format(path, os.getpid())
+    with open(temporary_path, 'wb') as f:
+        pickle.dump(snapshot, f, PICKLE_PROTOCOL)
+    os.rename(temporary_path, path)
+
+
+def read_snapshot(path):
+    """
+    Reads snapshot from file. Returns None if it doesn't exist or is in other format. Snapshot is unpickled, so it
+    must come from trusted source.
+    """
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError, ImportError, AttributeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('format') != FORMAT:
+        return None
+    return snapshot
+
+
+def get_snapshot():
+    """
+    Returns snapshot from file set in `ADMIN_TOOLBOX['menu_snapshot']`, it's read once per process.
+    """
+    global _snapshot
+    if _snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                _snapshot = read_snapshot(settings.menu_snapshot) or {}
+    return _snapshot
+
+
+def reset():
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def load_menu(menu_name):
+    """
+    Returns nodes of menu from snapshot, or None if menu is not in snapshot or snapshot doesn't match current registry,
+    settings or script prefix and URL conf.
+    """
+    snapshot = get_snapshot()
+    records = snapshot.get('menus', {}).get(menu_name)
+    if records is None:
+        return None
+    if (
+        tuple(snapshot['url_key']) != registry.get_url_key() or
+        snapshot['settings'] is None or snapshot['settings'] != get_settings_fingerprint() or
+        snapshot['registry'] != get_registry_fingerprint()
+    ):
+        return None
+    return load_nodes(records)
@@ -5,6 +5,227 @@
         var me = $(this);
         var li = me.closest('li');
         li.toggleClass('expanded');
+
+        if (me.attr('data-subtree-url') && !me.data('su-loading')) {
+            loadSubtree(me, li.children('ul'), me.parentsUntil('.su-sidebar-menu', 'ul').length + 2);
+        }
     })
 
-})(django.jQuery);
\ No newline at end of file
+    // Items of lazy lists are fetched when list is expanded for the first time. Browser revalidates them using their
+    // ETag, so unchanged items are not downloaded again. URL of items is dropped only when they are loaded, so list
+    // which items failed to load is fetched again when it's expanded next time.
+    function loadSubtree(link, ul, level) {
+        link.data('su-loading', true);
+        $.getJSON(link.attr('data-subtree-url'), function(subtree) {
+            link.removeAttr('data-subtree-url');
+            ul.empty().append(renderItems(subtree.items, level, []));
+        }).always(function() {
+            link.removeData('su-loading');
+        });
+    }
+
+    // Client-side rendering of sidebar (`sidebar_mode` set to `client`). Menu is fetched as JSON, where each item is
+    // described as [name, url, icon, items, subtreeUrl, badge], where last two are optional, and kept in browser's
+    // storage until version of menu changes. Lazy lists have URL of their items as subtreeUrl.
+
+    // default icons of items on each level of menu, last one is used for all deeper levels
+    var LEVEL_ICONS = ['angle-right', 'angle-double-right', 'angle-triple-right'];
+    var STORAGE_PREFIX = 'admin-toolbox-menu:';
+
+    function readStored(url) {
+        try {
+            return JSON.parse(window.localStorage.getItem(STORAGE_PREFIX + url));
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function store(url, menu) {
+        try {
+            window.localStorage.setItem(STORAGE_PREFIX + url, JSON.stringify(menu));
+        } catch (e) {
+            // storage may be full or disabled, menu will be fetched again next time
+        }
+    }
+
+    function hasSubitems(item) {
+        return item[3] && item[3].length;
+    }
+
+    function renderItems(items, level, active) {
+        return $.map(items, function(item) {
+            var li = $('<li>').attr('class', active[0] === item ? 'active' : '');
+            var link = $('<a>').append(
+                $('<i>').attr('class', 'fa fa-' + (item[2] || LEVEL_ICONS[Math.min(level, LEVEL_ICONS.length) - 1])),
+                document.createTextNode(item[0])
+            );
+            if (item[5] !== undefined && item[5] !== null) {
+                link.append($('<span class="su-badge">').text(item[5]));
+            }
+            li.append(link);
+
+            if (item[4]) {
+                link.attr({href: '#', 'class': 'with-subitems', 'data-subtree-url': item[4]});
+                li.append($('<ul>'));
+            } else if (hasSubitems(item)) {
+                link.attr({href: '#', 'class': 'with-subitems'});
+                li.append($('<ul>').append(renderItems(item[3], level + 1, active[0] === item ? active.slice(1) : [])));
+            } else {
+                link.attr('href', item[1] || '');
+            }
+            return li[0];
+        });
+    }
+
+    // Same as on server, active item is the one with longest URL that current path starts with.
+    function findActivePath(items, path) {
+        var best = {length: -1, path: []};
+        $.each(items, function(i, item) {
+            var found;
+            if (hasSubitems(item)) {
+                found = findActivePath(item[3], path);
+                found.path.unshift(item);
+            } else if (item[1] && path.indexOf(item[1]) === 0) {
+                found = {length: item[1].length, path: [item]};
+            }
+            if (found && found.length > best.length) {
+                best = found;
+            }
+        });
+        return best;
+    }
+
+    function render(sidebar, menu) {
+        var active = findActivePath(menu.items, window.location.pathname).path;
+        sidebar.children('ul.su-sidebar-menu').first().empty().append(renderItems(menu.items, 1, active));
+    }
+
+    $(function() {
+        var sidebar = $('#su-sidebar[data-menu-url]');
+        if (!sidebar.length) {
+            return;
+        }
+        var url = sidebar.attr('data-menu-url');
+        var version = sidebar.attr('data-menu-version');
+
+        var stored = readStored(url);
+        if (stored && stored.version === version) {
+            render(sidebar, stored);
+            return;
+        }
+
+        // browser revalidates response using it's ETag, so unchanged menu is not downloaded again
+        $.getJSON(url, function(menu) {
+            store(url, menu);
+            render(sidebar, menu);
+        });
+    });
+
+    // Filtering of sidebar (`sidebar_search` set to `True`). Search index of menu is fetched when filter box is
+    // focused for the first time. It's URL contains version of index, so browser can keep it in cache. Entries are
+    // described as [name, url, group, normalizedName] and groups as [name, normalizedName]. Matching entries are shown
+    // in place of menu, so menu itself is never re-rendered.
+
+    var MAX_RESULTS = 50;
+
+    function normalize(text) {
+        if (text.normalize) {
+            text = text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+        }
+        return text.toLowerCase();
+    }
+
+    function prepareIndex(index) {
+        // text searched for each entry is computed once, so filtering thousands of entries is just substring search
+        index.haystacks = $.map(index.entries, function(entry) {
+            return entry[2] === null ? entry[3] : entry[3] + ' ' + index.groups[entry[2]][1];
+        });
+        return index;
+    }
+
+    function filterEntries(index, query) {
+        var words = normalize(query).split(/\s+/);
+        var results = [];
+        for (var i = 0; i < index.entries.length && results.length < MAX_RESULTS; i++) {
+            var haystack = index.haystacks[i];
+            var matches = true;
+            for (var j = 0; j < words.length && matches; j++) {
+                matches = haystack.indexOf(words[j]) !== -1;
+            }
+            if (matches) {
+                results.push(index.entries[i]);
+            }
+        }
+        return results;
+    }
+
+    function renderResults(index, entries) {
+        return $.map(entries, function(entry) {
+            var link = $('<a>').attr('href', entry[1]).append(
+                $('<i class="fa fa-angle-right">'),
+                document.createTextNode(entry[0])
+            );
+            if (entry[2] !== null) {
+                link.append($('<small class="su-search-group">').text(index.groups[entry[2]][0]));
+            }
+            return $('<li>').append(link)[0];
+        });
+    }
+
+    $(function() {
+        var sidebar = $('#su-sidebar[data-search-url]');
+        if (!sidebar.length) {
+            return;
+        }
+        var input = $('<input type="search" class="su-sidebar-search">').attr(
+            'placeholder', typeof gettext === 'function' ? gettext('Filter') : 'Filter'
+        );
+        var results = $('<ul class="su-sidebar-menu su-sidebar-results">').hide();
+        var index = null;
+        var loading = false;
+        sidebar.prepend(input).append(results);
+
+        function load() {
+            if (index || loading) {
+                return;
+            }
+            loading = true;
+            $.getJSON(sidebar.attr('data-search-url'), function(data) {
+                index = prepareIndex(data);
+                update();
+            }).always(function() {
+                loading = false;
+            });
+        }
+
+        function update() {
+            var query = $.trim(input.val());
+            var menu = sidebar.children('ul.su-sidebar-menu').not(results);
+            if (!query) {
+                results.hide().empty();
+                menu.show();
+                return;
+            }
+            if (!index) {
+                load();
+                return;
+            }
+            results.empty().append(renderResults(index, filterEntries(index, query))).show();
+            menu.hide();
+        }
+
+        input.on('focus', load).on('input', update).on('keydown', function(e) {
+            if (e.which === 13) {
+                var first = results.find('a').first();
+                if (first.length) {
+                    e.preventDefault();
+                    window.location.href = first.attr('href');
+                }
+            } else if (e.which === 27) {
+                input.val('');
+                update();
+            }
+        });
+    });
+
+})(django.jQuery);
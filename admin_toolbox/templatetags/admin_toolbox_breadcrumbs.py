@@ -1,20 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from operator import itemgetter
-
 from django.core.exceptions import ImproperlyConfigured
 from django.template.loader import render_to_string
 from django.utils.translation import ugettext as _
-from six import text_type
 from django import template
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
-from admin_toolbox import settings
+from admin_toolbox import instrumentation, metrics, rendering, settings
+from admin_toolbox.breadcrumbs import get_model_admin, merge_active_path, parse_breadcrumbs
 
-from .admin_toolbox_sidebar import admin_sidebar_content
+from .admin_toolbox_sidebar import get_sidebar_content, sidebar_visible
 
 register = template.Library()
 
@@ -32,58 +26,57 @@ class RerenderBreadcrumbs(template.Node):
         self.nodelist = nodelist
         pass
 
-    def parse_node(self, node):
-        soup = BeautifulSoup(node)
-        if soup.find_all('a'):
-            node = soup.a
-            return node['href'], text_type(node.text).strip()
-        else:
-            return None, node.strip()
+    def get_structured_nodes(self, context):
+        """
+        Returns breadcrumbs provided as data, either by `toolbox_breadcrumbs` context variable or by
+        `get_toolbox_breadcrumbs(request, context)` method of current ModelAdmin. None if there are none.
+        """
+        nodes = context.get('toolbox_breadcrumbs')
+        if nodes is None:
+            model_admin = get_model_admin(context)
+            if model_admin is not None and hasattr(model_admin, 'get_toolbox_breadcrumbs'):
+                nodes = model_admin.get_toolbox_breadcrumbs(getattr(context, 'request', None), context)
+        if nodes is None:
+            return None
+        return [(url, title) for url, title in nodes]
 
     def render(self, context):
-        tx = self.nodelist.render(context)
-        tx = tx.strip()
-
         if settings.breadcrumbs not in [None, 'auto', 'auto-smart', 'smart', 'force-smart']:
             raise ImproperlyConfigured("ADMIN_TOOLBOX['breadcrumbs'] must be one of: "
                                        "[None, 'auto', 'auto-smart', 'smart', 'force-smart']")
 
-        if not tx and settings.breadcrumbs != 'force-smart' or settings.breadcrumbs is None:
+        if settings.breadcrumbs is None:
             return ''
 
-        if settings.breadcrumbs in ['smart', 'force-smart'] and BeautifulSoup is None:
-            raise ImproperlyConfigured('beautifulsoup4 package is required for smart breadcrumbs to operate.')
+        nodes = self.get_structured_nodes(context)
+        collector = metrics.get_metrics()
 
-        if BeautifulSoup is None:
-            if settings.breadcrumbs == 'auto-smart':
-                return ''
-            return tx
+        if nodes is None:
+            tx = self.nodelist.render(context)
+            tx = tx.strip()
 
-        soup = BeautifulSoup(tx)
-        tx = "".join(map(text_type, soup.div.contents if soup.div else []))
+            if not tx and settings.breadcrumbs != 'force-smart':
+                return ''
 
-        nodes = [self.parse_node(node) for node in tx.split('›') if node]
+            collector.increment('breadcrumbs.requests', tags={'source': 'parsed'})
+            with instrumentation.timed('breadcrumbs-parse'), collector.timer('breadcrumbs.parse_seconds'):
+                nodes = parse_breadcrumbs(tx)
+        else:
+            collector.increment('breadcrumbs.requests', tags={'source': 'structured'})
 
         if not nodes:
             nodes = [
                 (None, _('Home'))
             ]
 
-        active_path = admin_sidebar_content(context)['active_path']
-
-        index_node = nodes[0]
-        if active_path and active_path[-1]['url'] in set(map(itemgetter(0), nodes)):
-            nodes = nodes[list(map(itemgetter(0), nodes)).index(active_path[-1]['url']) + 1:]
-            nodes = [index_node] + [
-                (node.get('url'), node['name']) for node in active_path
-            ] + nodes
-        elif active_path:
-            nodes = [index_node] + [
-                (node.get('url'), node['name']) for node in active_path
-            ]
-            if len(nodes) > 1:
-                nodes[-1] = (None, nodes[-1][1])
-        elif len(nodes) > 1:
-            nodes = [index_node, nodes[-1]]
-
-        return render_to_string('admin_toolbox/breadcrumbs.html', context={'nodes': nodes})
+        if sidebar_visible(getattr(context, 'request', None)):
+            active_path = get_sidebar_content(context)['active_path']
+        else:
+            active_path = []
+
+        with instrumentation.timed('breadcrumbs-render'):
+            nodes = merge_active_path(nodes, active_path)
+            engine = getattr(getattr(context, 'template', None), 'engine', None)
+            if engine is not None and rendering.uses_default_template(engine, rendering.BREADCRUMBS_TEMPLATE):
+                return rendering.render_breadcrumbs(nodes)
+            return render_to_string(rendering.BREADCRUMBS_TEMPLATE, context={'nodes': nodes})
@@ -1,110 +1,164 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-import six
 from django import template
 from django.core.exceptions import ImproperlyConfigured
-from django.utils.module_loading import import_string
-from six import string_types
+from django.urls import reverse
+from django.utils.safestring import mark_safe
 
-from admin_toolbox import settings
+from admin_toolbox import fragments, instrumentation, menus, metrics, rendering, settings
+from admin_toolbox.nodes import MenuState
 
 register = template.Library()
 
 
-@register.inclusion_tag('admin_toolbox/sidebar.html', takes_context=True)
-def admin_sidebar_content(context, menu_name=None):
-
+def get_current_site_name(request):
+    """
+    Returns name of admin site that is handling current request, if it can be determined.
+    """
+    current_app = getattr(request, 'current_app', None)
+    if current_app:
+        return current_app
+    resolver_match = getattr(request, 'resolver_match', None)
+    return getattr(resolver_match, 'namespace', None)
+
+
+def get_menu_name(context, menu_name=None):
+    """
+    Menu can be specified in tag, using `toolbox_sidebar_name` context variable or by defining menu with same name as
+    admin site. Falls back to `default` menu.
+    """
+    menu_name = menu_name or context.get('toolbox_sidebar_name')
+    if menu_name:
+        return menu_name
+
+    site_name = get_current_site_name(getattr(context, 'request', None))
+    if site_name and site_name in settings.sidebar:
+        return site_name
+    return 'default'
+
+
+def get_sidebar_content(context, menu_name=None):
+    """
+    Returns items and active path of specified menu for current request. Result is memoized on the request, so every
+    tag that needs it during rendering of one page will share it.
+    """
     request = context.request
-    menu_name = menu_name or context.get('toolbox_sidebar_name') or 'default'
-
-    config = settings.sidebar.get(menu_name)
-
-    if isinstance(config, string_types):
-        config = (config, {})
-
-    if not isinstance(config, (list, tuple)) or len(config) != 2:
-        raise ImproperlyConfigured(menu_name)
-
-    builder_class_path, builder_kwargs = config
-    builder_kwargs.setdefault('name', 'Django admin')
-
-    builder_class = import_string(builder_class_path)
-    builder = builder_class(**builder_kwargs)
-
-    items = builder.build(request, context, menu_name)['items']
-
-    track_active = {}
-    track_existing = set()
-
-    current_url = request.path
-
-    level_stack = [(0, items, 0)]
-    last_remove = False
-
-    while level_stack:
-        level = level_stack[-1]
-        current_items = level[1]
-        item_no = level[2]
-
-        if last_remove:
-            current_items.pop(item_no)
-            last_remove = False
-        if item_no >= len(current_items):
-            level_stack.pop()
-            if item_no == 0:
-                last_remove = True
-            else:
-                try:
-                    parent = level_stack[-1]
-                except IndexError:
-                    break
-                level_stack[-1] = (
-                    parent[0],
-                    parent[1],
-                    parent[2] + 1,
-                )
-            continue
-
-        item = current_items[item_no]
-        if item is None:
-            current_items.pop(item_no)
-            continue
-
-        if 'items' in item:
-            level_stack.append((len(level_stack), item['items'], 0))
-            continue
-
-        if 'url' in item:
-            if item['url'] in track_existing:
-                current_items.pop(item_no)
-                continue
-            if current_url.startswith(item['url']):
-                track_active[
-                    tuple(s[2] for s in level_stack)
-                ] = item['url']
-            track_existing.add(item['url'])
-        item_no += 1
-        level_stack[-1] = (level[0], level[1], item_no)
-
-    track_active = sorted(
-        six.iteritems(track_active),
-        key=lambda x: (-len(x[1]), x[0])
-    )
-    current_items = items
-    active_path = []
-    if track_active:
-        for index in track_active[0][0]:
-            current_items[index]['active'] = True
-            active_path.append(current_items[index])
-            current_items = current_items[index]['items'] if 'items' in current_items[index] else []
+    menu_name = get_menu_name(context, menu_name)
+
+    try:
+        memo = request._admin_toolbox_sidebar
+    except AttributeError:
+        memo = request._admin_toolbox_sidebar = {}
+
+    if menu_name not in memo:
+        memo[menu_name] = build_sidebar_content(request, context, menu_name)
+    return memo[menu_name]
+
+
+def sidebar_visible(request):
+    """
+    Sidebar is rendered only for authenticated users, so there is no need to compute it for anyone else.
+    """
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated
+
 
+def get_opened(menu):
+    """
+    Returns indexes of lazy lists that are built for every request. Browser renders whole menu in client mode, so all
+    of them are built. Otherwise, lists are built only on active branch.
+    """
+    if settings.sidebar_mode == 'client':
+        return menu.lazy_nodes
+    return None
+
+
+def build_sidebar_content(request, context, menu_name):
+    metrics.get_metrics().increment('sidebar.requests', tags={'menu': menu_name})
+    menu = menus.get_menu(menu_name)
+    state = MenuState.build(menu, request, context, menu_name, get_opened(menu))
+    return get_state_content(state)
+
+
+def get_state_content(state):
     return {
-        'items': items,
-        'active_path': active_path
+        'items': state.items,
+        'active_path': state.bound_active_path,
+        'active_index': state.active_index,
+        'state': state,
     }
 
 
+def get_search_url(menu_name, content):
+    """
+    Returns URL of search index of menu, if search is enabled. If all items of menu are built for current request,
+    version of index is known and URL contains it, so index can be cached by browser.
+    """
+    if not settings.sidebar_search:
+        return None
+    url = reverse('admin_toolbox:search', kwargs={'menu_name': menu_name})
+    state = content['state']
+    if state.deferred:
+        return url
+    return '{}?v={}'.format(url, fragments.get_state_version(state))
+
+
+def render_client(context, menu_name, content):
+    """
+    Renders only placeholder of sidebar, which is filled in by `admin-sidebar.js` with menu fetched from JSON endpoint
+    (or from browser's storage, if version of menu didn't change).
+    """
+    menu_name = get_menu_name(context, menu_name)
+    sidebar_template = context.template.engine.get_template('admin_toolbox/sidebar_client.html')
+    return sidebar_template.render(context.new({
+        'menu_url': reverse('admin_toolbox:menu', kwargs={'menu_name': menu_name}),
+        'menu_version': fragments.get_menu_version(content['state']),
+        'search_url': content.get('search_url'),
+    }))
+
+
+@register.simple_tag(takes_context=True)
+def admin_sidebar_content(context, menu_name=None):
+    """
+    Renders sidebar. Overridden `admin_toolbox/sidebar.html` template is rendered the same way as by inclusion tag
+    this tag used to be, but the tag returns rendered HTML instead of context of the template.
+    """
+    if settings.sidebar_mode not in ['server', 'client']:
+        raise ImproperlyConfigured("ADMIN_TOOLBOX['sidebar_mode'] must be one of: ['server', 'client']")
+
+    content = get_sidebar_content(context, menu_name)
+    if settings.sidebar_search:
+        content = dict(content, search_url=get_search_url(get_menu_name(context, menu_name), content))
+    if settings.sidebar_mode == 'client':
+        with instrumentation.timed('sidebar-render'):
+            return render_client(context, menu_name, content)
+    engine = context.template.engine
+
+    if rendering.uses_default_template(engine):
+        levels = None
+
+        def render(values):
+            return rendering.render_sidebar(values['items'], values.get('search_url'))
+    else:
+        levels = fragments.RENDERED_LEVELS
+        sidebar_template = engine.get_template(rendering.SIDEBAR_TEMPLATE)
+        # cached sidebar is shared by users, so it can't contain their CSRF token
+        csrf_token = context.get('csrf_token') if settings.sidebar_cache is None else None
+
+        def render(values):
+            # same as for inclusion tag, sidebar is rendered in clean context containing only values and CSRF token
+            if csrf_token is not None:
+                values = dict(values, csrf_token=csrf_token)
+            return sidebar_template.render(context.new(values))
+
+    with instrumentation.timed('sidebar-render'):
+        if settings.sidebar_cache is None:
+            return render(dict(content))
+
+        return mark_safe(fragments.render_cached(get_menu_name(context, menu_name), content, render, levels))
+
+
 @register.filter
 def get_by_key(var, key):
     return var.get(key)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+
+class URLPrefixNode(object):
+    __slots__ = ('children', 'url', 'partials')
+
+    def __init__(self):
+        self.children = {}
+        # URL ending exactly at this node (with trailing slash)
+        self.url = None
+        # URLs that end with incomplete segment after this node, as (remainder, url) pairs
+        self.partials = []
+
+
+class URLPrefixIndex(object):
+    """
+    Trie of menu URLs, keyed on URL path segments. Finds all menu URLs that given path starts with, in time depending
+    only on length of that path, not on size of menu.
+    """
+
+    def __init__(self, urls=()):
+        self.root = URLPrefixNode()
+        self.urls = set()
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add(self, url):
+        if url in self.urls:
+            return
+        self.urls.add(url)
+
+        segments = url.split('/')
+        node = self.root
+        for segment in segments[:-1]:
+            node = node.children.setdefault(segment, URLPrefixNode())
+
+        if segments[-1]:
+            node.partials.append((segments[-1], url))
+        else:
+            node.url = url
+
+    def match(self, path):
+        """
+        Returns all indexed URLs that `path` starts with, longest first.
+        """
+        matches = []
+        parts = path.split('/')
+        last = len(parts) - 1
+        node = self.root
+
+        for depth, part in enumerate(parts):
+            if node.url is not None:
+                matches.append(node.url)
+            for remainder, url in node.partials:
+                if part.startswith(remainder):
+                    matches.append(url)
+            if depth == last:
+                break
+            node = node.children.get(part)
+            if node is None:
+                break
+
+        matches.sort(key=len, reverse=True)
+        return matches
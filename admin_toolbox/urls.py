@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+try:
+    from django.urls import re_path as url
+except ImportError:
+    from django.conf.urls import url
+
+from admin_toolbox import views
+
+app_name = 'admin_toolbox'
+
+urlpatterns = [
+    url(r'^menu/(?P<menu_name>[^/]+)\.json$', views.menu, name='menu'),
+    url(r'^menu/(?P<menu_name>[^/]+)/search\.json$', views.search, name='search'),
+]
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import json
+
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified
+from django.template import RequestContext
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from admin_toolbox import fragments, menus, search as search_index, settings
+from admin_toolbox.nodes import BoundNode, MenuState
+from admin_toolbox.templatetags.admin_toolbox_sidebar import get_sidebar_content
+
+# search index requested with it's current version can be cached by browser for a year
+SEARCH_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def is_staff(request):
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_active and user.is_staff
+
+
+def get_menu_payload(request, menu_name):
+    """
+    Returns version and JSON-serializable description of menu as seen by user of current request, without active
+    state.
+    """
+    content = get_sidebar_content(RequestContext(request), menu_name)
+    version = fragments.get_menu_version(content['state'])
+    return version, {'version': version, 'items': fragments.describe_items(content['items'])}
+
+
+def get_subtree_payload(request, menu_name, index):
+    """
+    Same as `get_menu_payload`, but describes only items of lazy list at specified index of compiled menu.
+    """
+    menu = menus.get_menu(menu_name)
+    try:
+        position = int(index)
+    except ValueError:
+        raise Http404
+    # only canonical form of index is accepted, so each subtree has exactly one URL
+    if position < 0 or position >= len(menu.nodes) or '{}'.format(position) != index:
+        raise Http404
+    node = menu.nodes[position]
+    if not node.lazy:
+        raise Http404
+
+    opened = set()
+    parent = node
+    while parent is not None:
+        opened.add(parent.index)
+        parent = parent.parent
+
+    state = MenuState.build(menu, request, RequestContext(request), menu_name, opened)
+    if not state.is_visible(node):
+        raise Http404
+    items = [BoundNode(child, state) for child in state.children(node)]
+    version = fragments.get_menu_version(state, node)
+    return version, {'version': version, 'items': fragments.describe_items(items)}
+
+
+def menu(request, menu_name):
+    """
+    Returns menu filtered by permissions of current user as JSON. Items are described as lists of name, URL, icon and
+    sub-items, lazy lists which items are not built have URL of their items as 5th element. If `node` query parameter
+    is provided, only items of lazy list with that index are returned. Response has strong ETag, so browser has to
+    download menu again only if it has changed.
+    """
+    if not is_staff(request):
+        return HttpResponseForbidden()
+    if menu_name not in settings.sidebar:
+        raise Http404
+
+    if 'node' in request.GET:
+        version, payload = get_subtree_payload(request, menu_name, request.GET['node'])
+    else:
+        version, payload = get_menu_payload(request, menu_name)
+
+    response = get_json_response(request, version, payload)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def search(request, menu_name):
+    """
+    Returns search index of menu as seen by user of current request, with all lazy lists built, as JSON. When requested
+    with `v` parameter equal to current version of index, response can be cached by browser for a long time, as
+    version changes with every change of menu.
+    """
+    if not is_staff(request):
+        return HttpResponseForbidden()
+    if menu_name not in settings.sidebar:
+        raise Http404
+
+    menu = menus.get_menu(menu_name)
+    state = MenuState.build(menu, request, RequestContext(request), menu_name, menu.lazy_nodes)
+    version = fragments.get_state_version(state)
+    payload = dict(search_index.get_index(state.items), version=version)
+
+    response = get_json_response(request, version, payload)
+    if request.GET.get('v') == version:
+        patch_cache_control(response, private=True, max_age=SEARCH_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def get_json_response(request, version, payload):
+    """
+    Returns payload as JSON, with version as strong ETag, or empty response if browser has the same version already.
+    """
+    etag = quote_etag(version)
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(json.dumps(payload, separators=(',', ':')), content_type='application/json')
+
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Cookie', 'Accept-Language'))
+    return response
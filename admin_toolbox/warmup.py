@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+from timeit import default_timer
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import request_started
+from django.urls import get_resolver
+
+from admin_toolbox import menus, settings
+
+_warmed_up = False
+_lock = threading.Lock()
+
+
+def build_menu(menu_name):
+    """
+    Compiles menu from scratch and returns it, together with time it took (in seconds).
+    """
+    menus.invalidate(menu_name)
+    start = default_timer()
+    menu = menus.get_menu(menu_name)
+    return menu, default_timer() - start
+
+
+def build_menus():
+    """
+    Compiles all configured menus. Returns list of 3-tuples of menu name, compiled menu and build time.
+    """
+    return [(menu_name,) + build_menu(menu_name) for menu_name in settings.sidebar]
+
+
+def warm_up():
+    """
+    Builds all configured menus, so first request doesn't have to. Raises `ImproperlyConfigured` if any of them
+    cannot be built. It has to be called when all apps are loaded, for example in `wsgi.py` after application is
+    created.
+    """
+    # admin sites may be created when URL conf is imported
+    get_resolver().url_patterns
+
+    for menu_name in settings.sidebar:
+        try:
+            build_menu(menu_name)
+        except Exception as e:
+            raise ImproperlyConfigured("Menu '{}' of ADMIN_TOOLBOX['sidebar'] cannot be built: {!r}".format(
+                menu_name, e,
+            ))
+
+
+def warm_up_on_request(**kwargs):
+    """
+    Receiver of `request_started`, building all menus when first request of process starts, when script prefix of
+    requests is already known. Connected when `ADMIN_TOOLBOX['warmup']` is set.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    with _lock:
+        if _warmed_up:
+            return
+        request_started.disconnect(warm_up_on_request, dispatch_uid='admin_toolbox_warmup')
+        try:
+            warm_up()
+        finally:
+            _warmed_up = True
+
+
+def connect_signals():
+    request_started.connect(warm_up_on_request, dispatch_uid='admin_toolbox_warmup')
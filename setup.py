@@ -71,7 +71,8 @@ setup(
     ],
 
     extras_require={
-        'smart-breadcrumbs': ['beautifulsoup4'],
+        # smart breadcrumbs don't require any additional packages anymore, extra is kept for backwards compatibility
+        'smart-breadcrumbs': [],
     },
 
     setup_requires=[
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from admin_toolbox.builders.base import BaseBuilder
+
+
+def allow(request, context, menu_name):
+    return True
+
+
+def deny(request, context, menu_name):
+    return False
+
+
+class DynamicList(BaseBuilder):
+    """
+    List built on each request, with hidden items, duplicate URLs and empty sub-lists.
+    """
+
+    def __init__(self, name='Dynamic'):
+        super(DynamicList, self).__init__()
+        self.name = name
+
+    def build(self, request=None, context=None, menu_name='default'):
+        return {'name': self.name, 'icon': None, 'items': [
+            {'url': '/admin/dynamic/', 'name': 'Dynamic item', 'icon': None},
+            None,
+            {'url': '/admin/dynamic/', 'name': 'Dynamic duplicate', 'icon': None},
+            {'url': '/admin/static/', 'name': 'Duplicate of static item', 'icon': None},
+            {'name': 'Empty', 'icon': None, 'items': [None, {'name': 'Empty too', 'items': []}]},
+            {'name': 'Nested', 'icon': None, 'items': [
+                {'url': '/admin/dynamic/nested/', 'name': 'Dynamic nested item', 'icon': None},
+            ]},
+        ]}
+
+
+class DynamicItem(BaseBuilder):
+
+    def __init__(self, url, name):
+        super(DynamicItem, self).__init__()
+        self.url = url
+        self.name = name
+
+    def build(self, request=None, context=None, menu_name='default'):
+        return {'url': self.url, 'name': self.name, 'icon': None}
+
+
+class Hidden(BaseBuilder):
+
+    def build(self, request=None, context=None, menu_name='default'):
+        return None
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+
+from admin_toolbox.breadcrumbs import merge_active_path, parse_breadcrumbs
+
+HOME = ('/admin/', 'Home')
+
+
+class ParseBreadcrumbsTests(SimpleTestCase):
+
+    def test_admin_breadcrumbs(self):
+        html = '''
+            <div class="breadcrumbs">
+            <a href="/admin/">Home</a>
+            &rsaquo; <a href="/admin/auth/">Authentication and Authorization</a>
+            &rsaquo; <a href="/admin/auth/user/">Users</a>
+            &rsaquo; admin
+            </div>
+        '''
+
+        self.assertEqual(parse_breadcrumbs(html), [
+            HOME,
+            ('/admin/auth/', 'Authentication and Authorization'),
+            ('/admin/auth/user/', 'Users'),
+            (None, 'admin'),
+        ])
+
+    def test_entities_and_markup(self):
+        html = (
+            '<div><a href="/admin/">Home</a> &#8250; <a href="/admin/a/?x=1&amp;y=2"><b>A</b> &amp; B</a> '
+            '<a href="/admin/other/">Other</a> &rsaquo; <em>&quot;C&quot;</em><br/></div>'
+        )
+
+        self.assertEqual(parse_breadcrumbs(html), [HOME, ('/admin/a/?x=1&y=2', 'A & B'), (None, '"C"')])
+
+    def test_only_first_div(self):
+        html = (
+            'Before › <a href="/before/">Before</a>'
+            '<div><a href="/admin/">Home</a><div class="inner">Nested</div> › Last</div>'
+            '<div><a href="/after/">After</a> › After</div>'
+        )
+
+        self.assertEqual(parse_breadcrumbs(html), [HOME, (None, 'Last')])
+
+    def test_unclosed_div(self):
+        self.assertEqual(parse_breadcrumbs('<div><a href="/admin/">Home</a> › Last'), [HOME, (None, 'Last')])
+
+    def test_empty(self):
+        self.assertEqual(parse_breadcrumbs(''), [])
+        self.assertEqual(parse_breadcrumbs('<div></div>'), [])
+
+
+class MergeActivePathTests(SimpleTestCase):
+
+    nodes = [HOME, ('/admin/auth/', 'Auth'), ('/admin/auth/user/', 'Users'), (None, 'admin')]
+
+    def test_active_item_in_breadcrumbs(self):
+        active_path = [{'name': 'Accounts'}, {'name': 'People', 'url': '/admin/auth/user/'}]
+
+        self.assertEqual(merge_active_path(self.nodes, active_path), [
+            HOME, (None, 'Accounts'), ('/admin/auth/user/', 'People'), (None, 'admin'),
+        ])
+
+    def test_active_item_not_in_breadcrumbs(self):
+        active_path = [{'name': 'Accounts'}, {'name': 'People', 'url': '/admin/people/'}]
+
+        self.assertEqual(merge_active_path(self.nodes, active_path), [HOME, (None, 'Accounts'), (None, 'People')])
+
+    def test_without_active_path(self):
+        self.assertEqual(merge_active_path(self.nodes, []), [HOME, (None, 'admin')])
+        self.assertEqual(merge_active_path([HOME], []), [HOME])
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core import checks
+from django.test import SimpleTestCase, override_settings
+
+LAZY_SIDEBAR = {'default': ('admin_toolbox.builders.AppsListBuilder', {'lazy': True})}
+
+
+class ChecksTests(SimpleTestCase):
+
+    def get_errors(self):
+        return [error.id for error in checks.run_checks(tags=['admin_toolbox'])]
+
+    @override_settings(ADMIN_TOOLBOX={'breadcrumbs': 'smarter', 'sidebar_mode': 'browser'})
+    def test_invalid_settings(self):
+        self.assertEqual(self.get_errors(), ['admin_toolbox.E001', 'admin_toolbox.E002'])
+
+    @override_settings(ADMIN_TOOLBOX={'sidebar': {'default': 'tests.builders.Missing'}})
+    def test_menu_that_cannot_be_built(self):
+        self.assertEqual(self.get_errors(), ['admin_toolbox.E003'])
+
+    def test_endpoints_required_by_menu(self):
+        for options in [
+            {'sidebar': LAZY_SIDEBAR},
+            {'sidebar_mode': 'client'},
+            {'sidebar_search': True},
+        ]:
+            with override_settings(ADMIN_TOOLBOX=options, ROOT_URLCONF='tests.urls_without_toolbox'):
+                self.assertEqual(self.get_errors(), ['admin_toolbox.E004'], options)
+            with override_settings(ADMIN_TOOLBOX=options):
+                self.assertEqual(self.get_errors(), [], options)
+
+    def test_permissions_memoized_in_local_cache(self):
+        with override_settings(ADMIN_TOOLBOX={'permissions_cache_timeout': 300}):
+            self.assertEqual(self.get_errors(), ['admin_toolbox.W001'])
+        with override_settings(ADMIN_TOOLBOX={'permissions_cache_timeout': 300}, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        }):
+            self.assertEqual(self.get_errors(), [])
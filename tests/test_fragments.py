@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, override_settings
+
+from admin_toolbox import fragments, menus, metrics, rendering
+from admin_toolbox.nodes import MenuState
+from admin_toolbox.templatetags.admin_toolbox_sidebar import get_state_content
+
+SETTINGS = {'metrics': 'admin_toolbox.metrics.InMemoryMetrics', 'sidebar_cache': 'default'}
+
+
+class MarkActiveTests(TestCase):
+
+    def test_active_path_is_marked(self):
+        html = '<li class="{su-slot:0}"></li><li class="{su-slot:1}"><li class="{su-slot:1-0}"></li>' \
+               '<li class="{su-slot:1-1}"><li class="{su-slot:1-1-0}"></li></li></li><li class="{su-slot:10}"></li>'
+
+        self.assertEqual(fragments.mark_active(html, (1, 1, 0)), (
+            '<li class=""></li><li class="active"><li class=""></li>'
+            '<li class="active"><li class="active"></li></li></li><li class=""></li>'
+        ))
+
+    def test_nothing_is_marked_without_active_path(self):
+        html = '<li class="{su-slot:0}"></li><li class="{su-slot:0-0}"></li>'
+
+        self.assertEqual(fragments.mark_active(html, ()), '<li class=""></li><li class=""></li>')
+
+
+@override_settings(ADMIN_TOOLBOX=SETTINGS)
+class RenderCachedTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        metrics.reset()
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_content(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return get_state_content(MenuState.build(menus.get_menu('default'), request))
+
+    def render_python(self, values):
+        return rendering.render_sidebar(values['items'], values.get('search_url'))
+
+    def render_template(self, values):
+        return get_template(rendering.SIDEBAR_TEMPLATE).render(values)
+
+    def assertRendersSame(self, render, levels):
+        for path in ['/admin/', '/admin/auth/user/', '/admin/auth/group/1/change/', '/admin/auth/user/']:
+            content = self.get_content(path)
+            self.assertEqual(fragments.render_cached('default', content, render, levels), render(dict(content)))
+        self.assertIn('class="active"', render(dict(content)))
+
+        self.assertEqual(metrics.get_metrics().get_counter('sidebar.cache', tags={
+            'menu': 'default', 'result': 'miss',
+        }), 1)
+
+    def test_python_renderer(self):
+        self.assertRendersSame(self.render_python, None)
+
+    def test_template(self):
+        self.assertRendersSame(self.render_template, fragments.RENDERED_LEVELS)
+
+    def test_template_without_placeholders(self):
+        def render(values):
+            return ''.join('{}:{};'.format(item['name'], bool(item.get('active'))) for item in values['items'])
+
+        content = self.get_content('/admin/auth/user/')
+        self.assertEqual(fragments.render_cached('default', content, render), render(dict(content)))
+        self.assertIn(':True;', render(dict(content)))
+
+    def test_key_depends_on_visible_items(self):
+        staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        content = self.get_content('/admin/')
+        request = RequestFactory().get('/admin/')
+        request.user = staff
+        staff_content = get_state_content(MenuState.build(menus.get_menu('default'), request))
+
+        self.assertEqual(
+            fragments.get_fragment_key('default', content['state']),
+            fragments.get_fragment_key('default', self.get_content('/admin/auth/user/')['state']),
+        )
+        self.assertNotEqual(
+            fragments.get_fragment_key('default', content['state']),
+            fragments.get_fragment_key('default', staff_content['state']),
+        )
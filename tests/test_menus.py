@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import set_urlconf
+
+from admin_toolbox import menus, metrics, registry
+
+METRICS = {'metrics': 'admin_toolbox.metrics.InMemoryMetrics'}
+
+
+@override_settings(ADMIN_TOOLBOX=METRICS)
+class GetMenuTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        metrics.reset()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def test_url_key_is_the_same_outside_of_request(self):
+        key = registry.get_url_key()
+        set_urlconf('tests.urls')
+        try:
+            self.assertEqual(registry.get_url_key(), key)
+        finally:
+            set_urlconf(None)
+
+    def test_menu_compiled_outside_of_request_is_reused(self):
+        menu = menus.get_menu('default')
+        self.assertEqual(metrics.get_metrics().get_counter('menu.compiles'), 1)
+
+        response = self.client.get('/admin/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.get_metrics().get_counter('menu.compiles'), 1)
+        self.assertIs(menus.get_menu('default'), menu)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.test import RequestFactory, SimpleTestCase
+
+from admin_toolbox.builders import ListBuilder
+from admin_toolbox.menus import CompiledMenu
+from admin_toolbox.nodes import MenuState
+
+
+def item(url, name, check=None):
+    kwargs = {'url': url, 'name': name}
+    if check is not None:
+        kwargs['permissions_check'] = 'tests.builders.{}'.format(check)
+    return 'admin_toolbox.builders.ItemBuilder', kwargs
+
+
+def sub_list(name, *items):
+    return 'admin_toolbox.builders.ListBuilder', {'name': name, 'items': list(items)}
+
+
+def describe(items):
+    return [
+        (entry['name'], describe(entry['items'])) if entry.get('items') is not None else (entry['name'], entry['url'])
+        for entry in items
+    ]
+
+
+class CompactTests(SimpleTestCase):
+
+    def compile(self, *items):
+        return CompiledMenu('default', ListBuilder(list(items), name=None), 0)
+
+    def build(self, menu, path='/admin/'):
+        return MenuState.build(menu, RequestFactory().get(path))
+
+    def test_deep_nesting(self):
+        menu = self.compile(
+            item('/admin/', 'Home'),
+            sub_list('L1', sub_list('L2', sub_list('L3', sub_list('L4', sub_list(
+                'L5', item('/admin/deep/', 'Deep'), item('/admin/hidden/', 'Hidden', 'deny'),
+            )), item('/admin/l3/', 'L3 item', 'deny')))),
+        )
+        state = self.build(menu, '/admin/deep/1/change/')
+
+        self.assertEqual(describe(state.items), [
+            ('Home', '/admin/'),
+            ('L1', [('L2', [('L3', [('L4', [('L5', [('Deep', '/admin/deep/')])])])])]),
+        ])
+        self.assertEqual([node.name for node in state.active_path], ['L1', 'L2', 'L3', 'L4', 'L5', 'Deep'])
+        self.assertEqual(state.active_index, (1, 0, 0, 0, 0, 0))
+
+    def test_hidden_subtrees(self):
+        menu = self.compile(
+            sub_list('Hidden', item('/admin/a/', 'A', 'deny'), sub_list('Hidden too', item('/admin/b/', 'B', 'deny'))),
+            sub_list('Hidden dynamic', ('tests.builders.Hidden', {})),
+            sub_list('Empty'),
+            item('/admin/c/', 'C'),
+        )
+        state = self.build(menu)
+
+        self.assertEqual(describe(state.items), [('C', '/admin/c/')])
+        self.assertEqual(set(state.urls), {'/admin/c/'})
+
+    def test_duplicate_urls(self):
+        menu = self.compile(
+            item('/admin/a/', 'First'),
+            item('/admin/a/', 'Second'),
+            item('/admin/b/', 'Hidden', 'deny'),
+            sub_list('Duplicates only', item('/admin/a/', 'Third')),
+            sub_list('List', item('/admin/b/', 'Visible'), item('/admin/a/', 'Fourth')),
+        )
+        state = self.build(menu)
+
+        self.assertEqual(describe(state.items), [
+            ('First', '/admin/a/'),
+            ('List', [('Visible', '/admin/b/')]),
+        ])
+        self.assertEqual(state.urls['/admin/a/'].name, 'First')
+
+    def test_dynamic_builders(self):
+        menu = self.compile(
+            item('/admin/static/', 'Static'),
+            ('tests.builders.DynamicList', {}),
+            ('tests.builders.DynamicItem', {'url': '/admin/static/', 'name': 'Dynamic duplicate'}),
+            ('tests.builders.DynamicItem', {'url': '/admin/leaf/', 'name': 'Leaf'}),
+            item('/admin/dynamic/', 'Static duplicate'),
+        )
+        state = self.build(menu)
+
+        self.assertEqual(describe(state.items), [
+            ('Static', '/admin/static/'),
+            ('Dynamic', [
+                ('Dynamic item', '/admin/dynamic/'),
+                ('Nested', [('Dynamic nested item', '/admin/dynamic/nested/')]),
+            ]),
+            ('Leaf', '/admin/leaf/'),
+        ])
+
+    def test_active_path_in_dynamic_builder(self):
+        menu = self.compile(item('/admin/', 'Home'), ('tests.builders.DynamicList', {}))
+        state = self.build(menu, '/admin/dynamic/nested/1/')
+
+        self.assertEqual([node.name for node in state.active_path], ['Dynamic', 'Nested', 'Dynamic nested item'])
+        self.assertEqual(state.active_index, (1, 2, 0))
+
+    def test_active_path_longest_url(self):
+        menu = self.compile(
+            item('/admin/', 'Home'),
+            sub_list('App', item('/admin/app/', 'App item'), item('/admin/app/model/', 'Model', 'deny')),
+        )
+
+        state = self.build(menu, '/admin/app/model/')
+        self.assertEqual([node.name for node in state.active_path], ['App', 'App item'])
+
+        state = self.build(menu, '/other/')
+        self.assertEqual(state.active_path, ())
+
+    def test_results_and_states_are_independent(self):
+        menu = self.compile(
+            item('/admin/a/', 'A', 'deny'),
+            ('tests.builders.DynamicList', {}),
+        )
+        nodes = menu.nodes
+        hidden = self.build(menu)
+        visible = MenuState(menu)
+        visible.compact(None, None, 'default', results=dict(
+            (node.index, None if node.dynamic else True) for node in menu.nodes if not node.is_list or node.dynamic
+        ))
+
+        self.assertIs(menu.nodes, nodes)
+        self.assertEqual([name for name, items in describe(hidden.items)], ['Dynamic'])
+        self.assertEqual(describe(visible.items), [('A', '/admin/a/')])
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import Group, Permission, User
+from django.test import RequestFactory, TestCase, override_settings
+
+from admin_toolbox import metrics, permission_checks, permissions
+from admin_toolbox.builders import ItemBuilder
+
+SETTINGS = {'metrics': 'admin_toolbox.metrics.InMemoryMetrics', 'permissions_cache_timeout': 300}
+
+
+@override_settings(ADMIN_TOOLBOX=SETTINGS)
+class PermissionEvaluatorTests(TestCase):
+
+    def setUp(self):
+        permissions.bump_version()
+        metrics.reset()
+        self.user = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+
+    def evaluate(self):
+        # fresh instance of user, as it is in every request
+        return permissions.PermissionEvaluator(User.objects.get(pk=self.user.pk))
+
+    def get_memo_counter(self, result):
+        return metrics.get_metrics().get_counter('permissions.memo', tags={'result': result})
+
+    def test_memoized(self):
+        self.user.user_permissions.add(Permission.objects.get(codename='view_user'))
+
+        self.assertEqual(self.evaluate().module_perms, frozenset(['auth']))
+        self.assertTrue(self.evaluate().has_module_perms('auth'))
+        self.assertFalse(self.evaluate().has_module_perms('admin'))
+        self.assertEqual((self.get_memo_counter('miss'), self.get_memo_counter('hit')), (1, 2))
+
+    def test_user_permissions_changed(self):
+        self.assertFalse(self.evaluate().has_module_perms('auth'))
+
+        self.user.user_permissions.add(Permission.objects.get(codename='view_user'))
+        self.assertTrue(self.evaluate().has_module_perms('auth'))
+
+        self.user.user_permissions.clear()
+        self.assertFalse(self.evaluate().has_module_perms('auth'))
+        self.assertEqual(self.get_memo_counter('hit'), 0)
+
+    def test_group_permissions_changed(self):
+        group = Group.objects.create(name='Editors')
+        self.user.groups.add(group)
+        self.assertFalse(self.evaluate().has_module_perms('auth'))
+
+        group.permissions.add(Permission.objects.get(codename='view_group'))
+        self.assertTrue(self.evaluate().has_module_perms('auth'))
+
+        group.delete()
+        self.assertFalse(self.evaluate().has_module_perms('auth'))
+
+    def test_bump_version(self):
+        self.user.user_permissions.add(Permission.objects.get(codename='view_user'))
+        self.assertTrue(self.evaluate().has_module_perms('auth'))
+
+        # django doesn't send signals for rows of automatically created many-to-many tables
+        User.user_permissions.through.objects.filter(user=self.user).delete()
+        permissions.bump_version()
+        self.assertFalse(self.evaluate().has_module_perms('auth'))
+
+    def test_user_changed(self):
+        self.assertEqual(self.evaluate().module_perms, frozenset())
+
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertIs(self.evaluate().module_perms, True)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.evaluate().module_perms, frozenset())
+
+    @override_settings(ADMIN_TOOLBOX=dict(SETTINGS, permissions_cache_timeout=0))
+    def test_disabled(self):
+        self.evaluate()
+        self.evaluate()
+        self.assertEqual(metrics.get_metrics().get_counter('permissions.memo'), 0)
+
+
+def count_calls(request, context, menu_name):
+    count_calls.calls += 1
+    return True
+
+
+@override_settings(ADMIN_TOOLBOX=SETTINGS)
+class PermissionsCheckScopeTests(TestCase):
+
+    def setUp(self):
+        permission_checks.invalidate()
+        count_calls.calls = 0
+        self.users = [
+            User.objects.create_user(name, '{}@example.com'.format(name), 'password', is_staff=True)
+            for name in ('first', 'second')
+        ]
+
+    def get_request(self, user):
+        request = RequestFactory().get('/admin/')
+        request.user = user
+        return request
+
+    def check(self, scope, requests):
+        builder = ItemBuilder('/admin/', 'Item', permissions_check=count_calls, permissions_check_scope=scope)
+        for request in requests:
+            self.assertTrue(builder.check_permissions(request))
+        return count_calls.calls
+
+    def test_request_scope(self):
+        request = self.get_request(self.users[0])
+        self.assertEqual(self.check('request', [request, request, self.get_request(self.users[0])]), 2)
+
+    def test_user_scope(self):
+        requests = [self.get_request(user) for user in self.users * 2]
+        self.assertEqual(self.check('user', requests), 2)
+
+    def test_global_scope(self):
+        requests = [self.get_request(user) for user in self.users * 2]
+        self.assertEqual(self.check('global', requests), 1)
+
+    def test_invalidate(self):
+        self.check('global', [self.get_request(self.users[0])])
+        permission_checks.invalidate()
+        self.assertEqual(self.check('global', [self.get_request(self.users[0])]), 2)
+
+    def test_without_scope(self):
+        request = self.get_request(self.users[0])
+        self.assertEqual(self.check(None, [request, request]), 2)
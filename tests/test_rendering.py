@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, override_settings
+
+from admin_toolbox import menus, metrics, rendering
+from admin_toolbox.nodes import MenuState
+from admin_toolbox.templatetags.admin_toolbox_sidebar import get_state_content
+
+BADGES = {
+    'metrics': 'admin_toolbox.metrics.InMemoryMetrics',
+    'sidebar': {'default': ('admin_toolbox.builders.AppsListBuilder', {
+        'badges': {'auth.User': {'is_active': True}},
+    })},
+}
+LAZY = {
+    'sidebar': {'default': ('admin_toolbox.builders.ListBuilder', {'name': None, 'items': [
+        ('admin_toolbox.builders.ItemBuilder', {'url': '/admin/', 'name': 'Home <1>', 'icon': 'fa fa-home'}),
+        ('admin_toolbox.builders.AppsListBuilder', {'name': 'Apps', 'lazy': True}),
+    ]})},
+}
+
+
+def normalize(html):
+    return re.sub(r'>\s+<', '><', html.strip())
+
+
+class RenderSidebarTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        metrics.reset()
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_content(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return get_state_content(MenuState.build(menus.get_menu('default'), request))
+
+    def assertSameAsTemplate(self, path, search_url=None):
+        content = dict(self.get_content(path), search_url=search_url)
+        html = rendering.render_sidebar(content['items'], search_url)
+        self.assertEqual(html, normalize(get_template(rendering.SIDEBAR_TEMPLATE).render(content)))
+        return html
+
+    def test_same_as_template(self):
+        for path in ['/admin/', '/admin/auth/user/', '/other/']:
+            self.assertSameAsTemplate(path)
+        self.assertIn('data-search-url', self.assertSameAsTemplate('/admin/', '/toolbox/menu/default/search.json?v=1'))
+
+    @override_settings(ADMIN_TOOLBOX=LAZY)
+    def test_lazy_list_same_as_template(self):
+        self.assertIn('data-subtree-url', self.assertSameAsTemplate('/admin/'))
+        self.assertNotIn('data-subtree-url', self.assertSameAsTemplate('/admin/auth/user/'))
+        self.assertIn('Home &lt;1&gt;', self.assertSameAsTemplate('/admin/'))
+
+    @override_settings(ADMIN_TOOLBOX=BADGES)
+    def test_badges(self):
+        User.objects.create_user('inactive', 'inactive@example.com', 'password', is_active=False)
+        self.assertIn('<span class="su-badge">1</span>', self.assertSameAsTemplate('/admin/'))
+
+        User.objects.create_user('active', 'active@example.com', 'password')
+        self.assertIn('<span class="su-badge">2</span>', self.assertSameAsTemplate('/admin/'))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from six import StringIO
+
+from admin_toolbox import menus, metrics, snapshots
+
+
+class SnapshotTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'menus.snapshot')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def get_sidebar(self):
+        content = self.client.get('/admin/').content.decode('utf-8')
+        start = content.index('<div id="su-sidebar"')
+        return content[start:content.index('</ul>', start)]
+
+    def configure(self, **options):
+        options.setdefault('metrics', 'admin_toolbox.metrics.InMemoryMetrics')
+        return override_settings(ADMIN_TOOLBOX=options)
+
+    def test_snapshot_is_loaded_in_request(self):
+        with self.configure():
+            compiled = self.get_sidebar()
+            call_command('toolbox_snapshot_menus', self.path, stdout=StringIO())
+
+        with self.configure(menu_snapshot=self.path):
+            sidebar = self.get_sidebar()
+            collector = metrics.get_metrics()
+            self.assertEqual(collector.get_counter('menu.snapshot', {'menu': 'default', 'result': 'loaded'}), 1)
+            self.assertEqual(collector.get_counter('menu.compiles'), 0)
+            self.assertIsInstance(menus.get_menu('default').nodes[-1].builder, snapshots.SnapshotItemBuilder)
+
+        self.assertEqual(sidebar, compiled)
+
+    def test_menu_that_cannot_be_snapshotted_is_compiled(self):
+        sidebar = {'default': ('admin_toolbox.builders.ListBuilder', {'name': None, 'items': [
+            ('tests.builders.DynamicItem', {'url': '/admin/', 'name': 'Dynamic'}),
+        ]})}
+        with self.configure(sidebar=sidebar):
+            stdout = StringIO()
+            call_command('toolbox_snapshot_menus', self.path, stdout=stdout)
+            self.assertIn('default: skipped', stdout.getvalue())
+
+        with self.configure(sidebar=sidebar, menu_snapshot=self.path):
+            self.assertIn('Dynamic', self.get_sidebar())
+            collector = metrics.get_metrics()
+            self.assertEqual(collector.get_counter('menu.snapshot', {'menu': 'default', 'result': 'fallback'}), 1)
+            self.assertEqual(collector.get_counter('menu.compiles'), 1)
+
+    def test_snapshot_of_other_registry_is_ignored(self):
+        with self.configure():
+            call_command('toolbox_snapshot_menus', self.path, stdout=StringIO())
+
+        snapshot = snapshots.read_snapshot(self.path)
+        snapshot['registry'] = 'other'
+        snapshots.write_snapshot(snapshot, self.path)
+
+        with self.configure(menu_snapshot=self.path):
+            self.assertIsNone(snapshots.load_menu('default'))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import User
+from django.middleware.csrf import get_token
+from django.template import RequestContext, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from admin_toolbox import menus
+
+OVERRIDDEN_SIDEBAR = (
+    '{% for item in items %}[{{ item.name }}{% if item.active %}*{% endif %}]{% endfor %}{{ csrf_token }}'
+)
+
+OVERRIDDEN_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'context_processors': ['django.template.context_processors.csrf'],
+        'loaders': [
+            ('django.template.loaders.locmem.Loader', {'admin_toolbox/sidebar.html': OVERRIDDEN_SIDEBAR}),
+            'django.template.loaders.app_directories.Loader',
+        ],
+    },
+}]
+
+
+class SidebarTagTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_request(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return request
+
+    def render(self, request, source='{% load admin_toolbox_sidebar %}{% admin_sidebar_content %}'):
+        return Template(source).render(RequestContext(request, {'unrelated': 'value'}))
+
+    def test_default_template(self):
+        html = self.render(self.get_request('/admin/auth/user/'))
+
+        self.assertTrue(html.startswith('<div id="su-sidebar">'))
+        self.assertIn('<li class="active"><a href="/admin/auth/user/">', html)
+
+    def test_as_variable(self):
+        html = self.render(
+            self.get_request('/admin/'), '{% load admin_toolbox_sidebar %}{% admin_sidebar_content as sidebar %}'
+        )
+        self.assertEqual(html, '')
+
+    @override_settings(TEMPLATES=OVERRIDDEN_TEMPLATES)
+    def test_overridden_template(self):
+        request = self.get_request('/admin/auth/user/')
+        get_token(request)
+
+        html = self.render(request, '{% load admin_toolbox_sidebar %}{% admin_sidebar_content "default" %}')
+        self.assertRegex(html, r'^\[Authentication and Authorization\*\][0-9A-Za-z]{64}$')
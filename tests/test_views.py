@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
+from django.utils.http import quote_etag
+from six import text_type
+
+from admin_toolbox import menus
+
+LAZY = {
+    'sidebar': {'default': ('admin_toolbox.builders.AppsListBuilder', {'lazy': True})},
+}
+
+
+class MenuViewTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def test_not_modified(self):
+        response = self.client.get('/toolbox/menu/default.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], quote_etag(response.json()['version']))
+
+        response = self.client.get('/toolbox/menu/default.json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_version_changes_with_permissions(self):
+        staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        self.client.force_login(staff)
+        version = self.client.get('/toolbox/menu/default.json').json()['version']
+
+        staff.user_permissions.add(Permission.objects.get(codename='view_user'))
+        response = self.client.get('/toolbox/menu/default.json', HTTP_IF_NONE_MATCH=quote_etag(version))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()['version'], version)
+
+    @override_settings(ADMIN_TOOLBOX={'sidebar_mode': 'client'})
+    def test_client_mode_version(self):
+        page = self.client.get('/admin/').content.decode('utf-8')
+        version = re.search(r'data-menu-version="([0-9a-f]+)"', page).group(1)
+
+        response = self.client.get('/toolbox/menu/default.json', HTTP_IF_NONE_MATCH=quote_etag(version))
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ADMIN_TOOLBOX=LAZY)
+    def test_subtree(self):
+        menu = menus.get_menu('default')
+        index = menu.lazy_nodes[0]
+
+        response = self.client.get('/toolbox/menu/default.json', {'node': index})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row[0] for row in response.json()['items']],
+            [text_type(node.name) for node in menu.nodes if node.parent is menu.nodes[index]],
+        )
+
+        response = self.client.get('/toolbox/menu/default.json', {'node': index}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ADMIN_TOOLBOX=LAZY)
+    def test_invalid_subtree(self):
+        menu = menus.get_menu('default')
+        not_lazy = [node.index for node in menu.nodes if not node.lazy][0]
+
+        for node in ['-1', '01', 'x', str(len(menu.nodes)), str(not_lazy)]:
+            response = self.client.get('/toolbox/menu/default.json', {'node': node})
+            self.assertEqual(response.status_code, 404, node)
+
+    @override_settings(ADMIN_TOOLBOX=LAZY)
+    def test_hidden_subtree(self):
+        self.client.force_login(User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True))
+        index = menus.get_menu('default').lazy_nodes[0]
+
+        self.assertEqual(self.client.get('/toolbox/menu/default.json', {'node': index}).status_code, 404)
+
+    @override_settings(ADMIN_TOOLBOX=dict(LAZY, sidebar_search=True))
+    def test_search(self):
+        response = self.client.get('/toolbox/menu/default/search.json')
+        version = response.json()['version']
+        self.assertEqual(response.json()['entries'], [
+            ['Groups', '/admin/auth/group/', 0, 'groups'],
+            ['Users', '/admin/auth/user/', 0, 'users'],
+        ])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get('/toolbox/menu/default/search.json', {'v': version})
+        self.assertIn('immutable', response['Cache-Control'])
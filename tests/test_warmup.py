@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import User
+from django.core.signals import request_started
+from django.test import TestCase, override_settings
+
+from admin_toolbox import menus, metrics, warmup
+
+
+@override_settings(ADMIN_TOOLBOX={'metrics': 'admin_toolbox.metrics.InMemoryMetrics', 'warmup': True})
+class WarmUpTests(TestCase):
+
+    def setUp(self):
+        menus.invalidate()
+        metrics.reset()
+        warmup._warmed_up = False
+        self.addCleanup(request_started.disconnect, warmup.warm_up_on_request, dispatch_uid='admin_toolbox_warmup')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def test_menus_built_by_warm_up_are_used_by_requests(self):
+        warmup.warm_up()
+        self.client.get('/admin/')
+        self.assertEqual(metrics.get_metrics().get_counter('menu.compiles'), 1)
+
+    def test_menus_are_built_when_first_request_starts(self):
+        warmup.connect_signals()
+        request_started.send(sender=None)
+        self.assertEqual(metrics.get_metrics().get_counter('menu.compiles'), 1)
+
+        self.client.get('/admin/')
+        self.client.get('/admin/')
+        self.assertEqual(metrics.get_metrics().get_counter('menu.compiles'), 1)
+        self.assertTrue(warmup._warmed_up)
@@ -0,0 +1,12 @@
+from django.conf.urls import include
+from django.contrib import admin
+
+try:
+    from django.urls import re_path as url
+except ImportError:
+    from django.conf.urls import url
+
+urlpatterns = [
+    url(r'^toolbox/', include('admin_toolbox.urls')),
+    url(r'^admin/', admin.site.urls),
+]
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+try:
+    from django.urls import re_path as url
+except ImportError:
+    from django.conf.urls import url
+
+urlpatterns = [
+    url(r'^admin/', admin.site.urls),
+]
@@ -0,0 +1,309 @@
+"""
+Benchmark of sidebar and breadcrumbs rendering on synthetic project.
+
+Generates project with many apps and models registered in admin, configures sidebar with both automatic and manually
+specified items and measures latency percentiles and allocated memory of:
+
+- ``{% admin_sidebar_content %}`` tag,
+- rendering of built sidebar with ``admin_toolbox/sidebar.html`` template and with python renderer,
+- ``{% rebreadcrumbs %}`` tag (``RerenderBreadcrumbs.render``),
+- full admin page (rendering ``admin/base.html``), requested using django's test client.
+
+Each case is measured cold (all caches of admin toolbox dropped before every run) and warm.
+
+Usage::
+
+    python tools/benchmark.py --apps 50 --models 40 --iterations 200
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+def generate_project(directory, apps_count, models_count):
+    """
+    Writes apps with models and admin registrations into directory and returns list of app labels.
+    """
+    labels = []
+    for app_no in range(apps_count):
+        label = 'bench_app_{}'.format(app_no)
+        labels.append(label)
+        app_dir = os.path.join(directory, label)
+        os.makedirs(app_dir)
+
+        with open(os.path.join(app_dir, '__init__.py'), 'w'):
+            pass
+
+        with open(os.path.join(app_dir, 'models.py'), 'w') as f:
+            f.write('from django.db import models\n\n')
+            for model_no in range(models_count):
+                f.write(
+                    '\nclass Model{0}(models.Model):\n'
+                    '    name = models.CharField(max_length=10)\n'.format(model_no)
+                )
+
+        with open(os.path.join(app_dir, 'admin.py'), 'w') as f:
+            f.write('from django.contrib import admin\nfrom . import models\n\n')
+            for model_no in range(models_count):
+                f.write('admin.site.register(models.Model{})\n'.format(model_no))
+
+    with open(os.path.join(directory, 'bench_urls.py'), 'w') as f:
+        f.write(
+            'from django.contrib import admin\n'
+            'try:\n'
+            '    from django.urls import re_path as url\n'
+            'except ImportError:\n'
+            '    from django.conf.urls import url\n\n'
+            'urlpatterns = [url(r"^admin/", admin.site.urls)]\n'
+        )
+
+    with open(os.path.join(directory, 'bench_checks.py'), 'w') as f:
+        f.write(
+            'def staff_only(request, context, menu_name):\n'
+            '    return request.user.is_staff\n'
+        )
+
+    return labels
+
+
+def configure(directory, labels):
+    from django.conf import settings
+
+    sys.path.insert(0, directory)
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmark',
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=[
+            'admin_toolbox',
+            'django.contrib.admin',
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'django.contrib.sessions',
+            'django.contrib.messages',
+        ] + labels,
+        MIDDLEWARE=[
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+        ],
+        ROOT_URLCONF='bench_urls',
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True,
+            'OPTIONS': {'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ]},
+        }],
+        ADMIN_TOOLBOX={
+            'sidebar': {
+                'default': ('admin_toolbox.builders.AppsListBuilder', {
+                    'items': [
+                        ('admin_toolbox.builders.ItemBuilder', {'url': '/admin/', 'name': 'Dashboard', 'icon': 'home'}),
+                        ('admin_toolbox.builders.ListBuilder', {'name': 'Shortcuts', 'items': [
+                            ('admin_toolbox.builders.ModelBuilder', {'model_path': '{}.Model0'.format(label)})
+                            for label in labels[:10]
+                        ] + [
+                            ('admin_toolbox.builders.ItemBuilder', {
+                                'url': '/admin/{}/'.format(label),
+                                'name': label,
+                                'permissions_check': 'bench_checks.staff_only',
+                            })
+                            for label in labels[:10]
+                        ]}),
+                    ],
+                }),
+            },
+        },
+    )
+
+    import django
+    django.setup()
+
+
+def create_users(labels):
+    from django.contrib.auth.models import Permission, User
+    from django.core.management import call_command
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+    superuser = User.objects.create_superuser('superuser', 'superuser@example.com', 'password')
+    staff = User.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+    staff.user_permissions.set(
+        Permission.objects.filter(content_type__app_label__in=labels[::2], codename__startswith='view_')
+    )
+    return superuser, staff
+
+
+def drop_caches():
+    from django.core.cache import cache
+
+    from admin_toolbox import permissions, registry
+
+    registry.invalidate()
+    permissions.bump_version()
+    cache.clear()
+
+
+def make_request(user, path):
+    from django.test import RequestFactory
+
+    request = RequestFactory().get(path)
+    request.user = user
+    return request
+
+
+def sidebar_case(user, path):
+    from django.template import engines, RequestContext
+
+    template = engines['django'].engine.from_string('{% load admin_toolbox_sidebar %}{% admin_sidebar_content %}')
+
+    def run():
+        template.render(RequestContext(make_request(user, path)))
+    return run
+
+
+def breadcrumbs_case(user, path, model_label):
+    from django.template import engines, RequestContext
+
+    template = engines['django'].engine.from_string(
+        '{% load admin_toolbox_breadcrumbs %}{% rebreadcrumbs %}<div class="breadcrumbs">'
+        '<a href="/admin/">Home</a> &rsaquo; <a href="/admin/' + model_label + '/">App</a> &rsaquo; '
+        '<a href="' + path + '">Models</a> &rsaquo; Object</div>{% endrebreadcrumbs %}'
+    )
+
+    def run():
+        template.render(RequestContext(make_request(user, path + '1/change/')))
+    return run
+
+
+def render_case(user, path, renderer):
+    """
+    Renders already built sidebar, either with `admin_toolbox/sidebar.html` template or with python renderer, so they
+    can be compared.
+    """
+    from django.template import Context, engines, RequestContext
+
+    from admin_toolbox.rendering import render_sidebar
+    from admin_toolbox.templatetags.admin_toolbox_sidebar import get_sidebar_content
+
+    sidebar_template = engines['django'].engine.get_template('admin_toolbox/sidebar.html')
+    content = get_sidebar_content(RequestContext(make_request(user, path)))
+
+    def run():
+        if renderer == 'template':
+            sidebar_template.render(Context(content))
+        else:
+            render_sidebar(content['items'])
+    return run
+
+
+def page_case(user, path):
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+
+    def run():
+        response = client.get(path)
+        assert response.status_code == 200, response.status_code
+    return run
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def measure(run, iterations, cold):
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # memory is measured separately, so tracing doesn't affect timings
+    allocated = []
+    for _ in range(min(iterations, 20)):
+        if cold:
+            drop_caches()
+        tracemalloc.start()
+        run()
+        allocated.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': percentile(timings, 0.5),
+        'p90_ms': percentile(timings, 0.9),
+        'p99_ms': percentile(timings, 0.99),
+        'peak_kib': statistics.mean(allocated) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apps', type=int, default=50, help='number of generated apps')
+    parser.add_argument('--models', type=int, default=40, help='number of models in each app')
+    parser.add_argument('--iterations', type=int, default=100, help='number of runs of each warm case')
+    parser.add_argument('--cold-iterations', type=int, default=10, help='number of runs of each cold case')
+    parser.add_argument('--json', dest='json_output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='admin_toolbox_bench_')
+    try:
+        labels = generate_project(directory, args.apps, args.models)
+        configure(directory, labels)
+        superuser, staff = create_users(labels)
+
+        # staff user has permissions only for even apps
+        label = labels[0]
+        path = '/admin/{}/model1/'.format(label)
+        cases = []
+        for user in (superuser, staff):
+            cases.extend([
+                ('sidebar', user, sidebar_case(user, path)),
+                ('render-tpl', user, render_case(user, path, 'template')),
+                ('render-py', user, render_case(user, path, 'python')),
+                ('breadcrumbs', user, breadcrumbs_case(user, path, label)),
+                ('page', user, page_case(user, path)),
+            ])
+
+        results = []
+        print('{} apps x {} models'.format(args.apps, args.models))
+        print('{:<12} {:<10} {:<5} {:>9} {:>9} {:>9} {:>9} {:>11}'.format(
+            'case', 'user', 'cache', 'mean ms', 'p50 ms', 'p90 ms', 'p99 ms', 'peak KiB',
+        ))
+        for name, user, run in cases:
+            for cold in (True, False):
+                run()  # warm up imports and lazy initialization of django itself
+                result = measure(run, args.cold_iterations if cold else args.iterations, cold)
+                result.update(case=name, user=user.username, cache='cold' if cold else 'warm')
+                results.append(result)
+                print('{case:<12} {user:<10} {cache:<5} {mean_ms:>9.2f} {p50_ms:>9.2f} {p90_ms:>9.2f} {p99_ms:>9.2f} '
+                      '{peak_kib:>11.1f}'.format(**result))
+
+        if args.json_output:
+            with open(args.json_output, 'w') as f:
+                json.dump({'apps': args.apps, 'models': args.models, 'results': results}, f, indent=2)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()